@@ -1,4 +1,6 @@
 import time
+import importlib
+import traceback
 import numpy as np
 import keyboard
 
@@ -11,7 +13,19 @@ import threading
 
 from Utils.game_state import GameState
 from Utils.physics_object import PhysicsObject
-from Utils.player_data import PlayerData, global_player_data
+from Utils.input_snapshot import InputSnapshot
+from Utils.reward_batch import RewardPlan
+from Utils.trace import TraceWriter
+from Utils.console_writer import ConsoleWriter
+from Utils.reward_stats import RewardStats
+from Utils.telemetry import TelemetryExporter
+from Utils.profiler import Profiler
+from Utils.text_overlay import TextOverlay
+from Utils.frame_stepper import FrameStepper
+from Utils.round_tracker import RoundTracker, GOAL
+from Utils.reward_reload import FileWatcher, load_weights, apply_weights
+
+import reward_functions as reward_functions_module
 
 from reward_functions import (
     DistanceToBallReward,
@@ -29,14 +43,80 @@ from reward_functions import (
     AerialDistanceReward,
     PositiveRollReward,
     HoldInputReward,
+    PredictedGoalReward,
 )
 
+def create_reward_functions():
+    # Create a dictionary that maps reward functions to their weights
+    return {
+        EventReward({
+            'teamGoal': 0.0,
+            'concede': -0.0,
+            'touch': 0.0,
+            'shot': 0.0,
+            'save': 0.0,
+            'demo': 0.0,
+            'demoed': -0.0,
+            'boostPickup': 0.00,
+            'assist': 0.0
+        }): 1.0,
+        
+        HoldInputReward({
+            'positive_steer': 0.0,
+            'negative_steer': 0.0,
+            'positive_throttle': 0.0,
+            'negative_throttle': 0.0,
+            'positive_pitch': 0.0,
+            'negative_pitch': 0.0,
+            'positive_roll': 0.0,
+            'negative_roll': 0.0,
+            'jump': 0.0,
+            'boost': 0.0,
+            'handbrake': 0.0,
+            'use_item': 0.0
+        }): 0.0,
+        
+        FaceBallReward(): 0.0,
+        
+        VelocityBallToGoalReward(): 0.0,
+        
+        TouchBallReward(aerial_weight=0.5): 0.0,
+        
+        VelocityReward(): 0.0,
+        
+        SaveBoostReward(): 0.0,
+        
+        VelocityPlayerToBallReward(): 0.0,
+        
+        FlipResetReward(flip_reset_r=1.0, hold_flip_reset_r=0.01): 00.0,
+        
+        DribbleReward(): 0.0,
+        
+        LiuDistanceBallToGoalReward(): 0.0,
+        
+        LiuDistancePlayerToBallReward(): 0.0,
+        
+        DistanceToBallReward(): 0.0,
+        
+        AerialDistanceReward(height_scale=10.0, distance_scale=10.0, ang_vel_w=0.0): 0.0,
+        
+        PositiveRollReward(height_threshold=300.0, distance_threshold=300.0): 0.0,
+        
+        # Add new rewards at the end, positional weight_configurations lists rely on this order
+        PredictedGoalReward(horizon=3.0): 0.0,
+        
+    }
+
+
 class RewardTester(BaseScript):
-    def __init__(self):
+    def __init__(self, enable_hotkeys: bool = True):
         super().__init__("Reward Tester")
         self.tick_skip = 8
         self.game_state = GameState(self.get_field_info(), self.tick_skip)
-        self.ticks = 0
+        self.game_state.ball_prediction_source = self.get_ball_prediction_struct  # Only fetched in steps a reward reads it
+        self.frame_stepper = FrameStepper(self.tick_skip)  # Steps every tick_skip game frames, even if packets were missed
+        self.round_tracker = RoundTracker()  # Goals, kickoffs, new matches and car changes
+        self.round_needs_reset = True  # The rewards are reset with the state of the next scored step
         self.total_step_reward = 0
         self.total_average_step_reward = 0
         self.total_cumulative_reward = 0
@@ -44,122 +124,157 @@ class RewardTester(BaseScript):
         self.player_rewards = {}
         self.socket_relay = SocketRelay()
         self.player_data = None
+        self.player_inputs = InputSnapshot()  # Written by the SocketRelay thread, read once per step
 
         # ***PRINT SETTINGS***
         self.print_individual_rewards = True  
         self.print_individual_total_rewards = True  
         self.print_general_rewards = True  
         self.players_to_print = None #[0, 1]  # List of player IDs to print example = [0, 1], or None to print all players
+        self.print_every_n_steps = 1  # Quiet mode: only print every n steps
+        self.print_only_on_change = False  # Quiet mode: skip a report when it is identical to the last printed one
+        self.print_reward_stats_every_n_steps = 0  # Print mean/std/min/max/percentiles of every reward every n steps, 0 to disable
+        self.last_report = None
+        self.console_writer = ConsoleWriter()  # Prints on a background thread, stale reports are dropped if the console lags, messages never are
 
         # ***RENDER SETTINGS***
         self.enable_rendering = True  
         self.enable_individual_reward_rendering = True
         self.enable_general_reward_rendering = True 
         self.render_duration = 0.1  # Clear the text after x seconds
+        self.max_renders_per_second = 20  # Cap on how often changed text is sent to the game, independent of tick_skip
         self.last_render_time = 0
-        self.render_text_queue = []  # List to store the text to be rendered
+        self.overlay = None  # Only re-sends the text when it changed
         self.players_to_render = self.players_to_print  # Default to the same as players_to_print
 
-        # Create a dictionary that maps reward functions to their weights
-        self.reward_functions = {
-            EventReward({
-                'teamGoal': 0.0,
-                'concede': -0.0,
-                'touch': 0.0,
-                'shot': 0.0,
-                'save': 0.0,
-                'demo': 0.0,
-                'demoed': -0.0,
-                'boostPickup': 0.00,
-                'assist': 0.0
-            }): 1.0,
-            
-            HoldInputReward({
-                'positive_steer': 0.0,
-                'negative_steer': 0.0,
-                'positive_throttle': 0.0,
-                'negative_throttle': 0.0,
-                'positive_pitch': 0.0,
-                'negative_pitch': 0.0,
-                'positive_roll': 0.0,
-                'negative_roll': 0.0,
-                'jump': 0.0,
-                'boost': 0.0,
-                'handbrake': 0.0,
-                'use_item': 0.0
-            }): 0.0,
-            
-            FaceBallReward(): 0.0,
-            
-            VelocityBallToGoalReward(): 0.0,
-            
-            TouchBallReward(aerial_weight=0.5): 0.0,
-            
-            VelocityReward(): 0.0,
-            
-            SaveBoostReward(): 0.0,
-            
-            VelocityPlayerToBallReward(): 0.0,
-            
-            FlipResetReward(flip_reset_r=1.0, hold_flip_reset_r=0.01): 00.0,
-            
-            DribbleReward(): 0.0,
-            
-            LiuDistanceBallToGoalReward(): 0.0,
-            
-            LiuDistancePlayerToBallReward(): 0.0,
-            
-            DistanceToBallReward(): 0.0,
-            
-            AerialDistanceReward(height_scale=10.0, distance_scale=10.0, ang_vel_w=0.0): 0.0,
-            
-            PositiveRollReward(height_threshold=300.0, distance_threshold=300.0): 0.0,
-            
-        }
-
-        self.reset_thread = threading.Thread(target=self.reset_rewards, daemon=True)
-        self.reset_thread.start()
-
-    def reset_rewards(self):
+        # ***RECORD SETTINGS***
+        self.record_trace_path = None  # Path to record every tick to, example = "match.trace", replay it with replay.py
+        self.trace_writer = None
+
+        # ***EXPORT SETTINGS***
+        self.telemetry_directory = None  # Directory to export every step's raw and weighted rewards to as .npz shards, example = "telemetry"
+        self.telemetry_exporter = None
+
+        # ***PROFILE SETTINGS***
+        self.enable_profiling = True  # Time every stage of the loop and every reward, steps slower than tick_skip / 120 seconds are counted
+        self.print_budget_overruns = True  # Print the slowest rewards whenever a step goes over budget
+        self.render_profile = False  # Show the slowest rewards on screen, toggle with the keyboard key P
+        self.profile_top_n = 5  # Number of slowest rewards to print and show
+        self.profile_export_path = None  # Path to write the timings to as JSON when the script stops, example = "profile.json"
+        self.profiler = None
+
+        # ***RELOAD SETTINGS***
+        self.weights_path = None  # JSON file of reward class name -> weight applied over create_reward_functions, example = "weights.json"
+        self.reload_on_file_change = True  # Reload the rewards when reward_functions.py or the weights file is saved, or press L
+        self.reload_requested = False
+        self.reset_requested = False  # Set by the R key, the totals are reset on the main loop between two steps
+        self.file_watcher = None  # Built in start(), once weights_path is final
+
+        # Create a dictionary that maps reward functions to their weights (edit create_reward_functions above)
+        self.reward_functions = self.build_reward_functions()
+        # Other weightings to compare side by side with the one above, all computed from the same rewards every step.
+        # Name -> one weight per reward, in the order of create_reward_functions, example = {"touch": [0.0, 0.0, 0.0, 0.0, 1.0, ...]}
+        # weights only TouchBallReward, the fifth entry
+        self.weight_configurations = {}
+        self.reward_plan = None  # Rebuilt whenever the rewards or their weights change
+        self.reward_stats = RewardStats(len(self.reward_functions))  # Per player, per reward running statistics
+        self.component_rewards = np.zeros((0, len(self.reward_functions)))  # Raw rewards of the last step, players x rewards
+
+        # R, P and L keys, headless runs have no keyboard to poll
+        self.hotkey_thread = None
+        if enable_hotkeys:
+            self.hotkey_thread = threading.Thread(target=self.handle_hotkeys, daemon=True)
+            self.hotkey_thread.start()
+
+    def handle_hotkeys(self):
+        profile_key_was_pressed = False
         while True:
             if keyboard.is_pressed('r'):
-                self.total_step_reward = 0
-                self.total_average_step_reward = 0
-                self.total_cumulative_reward = 0
-                self.num_steps = 0
-                self.player_rewards = {}
-                print("Rewards reset.")
+                self.reset_requested = True
+            # Toggle once per key press, not on every poll while the key is held
+            profile_key_pressed = keyboard.is_pressed('p')
+            if profile_key_pressed and not profile_key_was_pressed:
+                self.render_profile = not self.render_profile
+            profile_key_was_pressed = profile_key_pressed
+            # The reload itself happens on the main loop, between two steps
+            if keyboard.is_pressed('l'):
+                self.reload_requested = True
             time.sleep(0.1)
 
-    def calculate_reward(self, player_data: PlayerData) -> float:
-        # Synchronize player data with global player data
-        player_data.steer_input = global_player_data[player_data.car_id].steer_input
-        player_data.throttle_input = global_player_data[player_data.car_id].throttle_input
-        player_data.pitch_input = global_player_data[player_data.car_id].pitch_input
-        player_data.roll_input = global_player_data[player_data.car_id].roll_input
-        player_data.jump_input = global_player_data[player_data.car_id].jump_input
-        player_data.boost_input = global_player_data[player_data.car_id].boost_input
-        player_data.handbrake_input = global_player_data[player_data.car_id].handbrake_input
-        player_data.use_item_input = global_player_data[player_data.car_id].use_item_input
-
-        reward = 0
-        for reward_function, weight in self.reward_functions.items():
-            reward += reward_function.get_reward(player_data, self.game_state, None) * weight
-        return reward
+    def reset_rewards(self):
+        # Only call this from the main loop, the totals hold one value per weight configuration
+        num_configurations = len(self.reward_plan.configuration_names) if self.reward_plan is not None else 1 + len(self.weight_configurations)
+        self.total_step_reward = np.zeros(num_configurations)
+        self.total_average_step_reward = np.zeros(num_configurations)
+        self.total_cumulative_reward = np.zeros(num_configurations)
+        self.num_steps = 0
+        self.player_rewards = {}
+        self.reward_stats.reset()  # Safe here, reward_stats.update also only runs on the main loop
+        self.console_writer.write("Rewards reset.\n", droppable=False)
+
+    def build_reward_functions(self) -> dict:
+        reward_functions = create_reward_functions()
+        if self.weights_path is not None:
+            reward_functions = apply_weights(reward_functions, load_weights(self.weights_path))
+        return reward_functions
+
+    def reload_rewards(self):
+        # Re-imports reward_functions.py and rebuilds the rewards, the old ones keep running if anything fails
+        module_globals = globals()
+        previous_classes = {
+            name: value for name, value in module_globals.items()
+            if isinstance(value, type) and value.__module__ == reward_functions_module.__name__
+        }
+        try:
+            module = importlib.reload(reward_functions_module)
+            # create_reward_functions uses the names imported at the top of this file
+            for name in previous_classes:
+                module_globals[name] = getattr(module, name)
+            reward_functions = self.build_reward_functions()
+            # Errors in the new rewards show up now instead of in the middle of a step
+            if self.game_state.players:
+                RewardPlan(reward_functions, self.weight_configurations).get_reward_matrix(self.game_state)
+        except Exception:
+            module_globals.update(previous_classes)
+            self.console_writer.write(f"Reloading the rewards failed, keeping the previous ones:\n{traceback.format_exc()}", droppable=False)
+            return
+        self.reward_functions = reward_functions
+        self.console_writer.write(f"Reloaded {len(reward_functions)} rewards\n", droppable=False)
+
+    def calculate_rewards(self) -> np.ndarray:
+        # Returns the reward of every player in self.game_state.players (rows) under every weight configuration (columns)
+        # One consistent copy of the latest inputs, the player's input attributes read from it
+        self.player_inputs.read_into(self.game_state.inputs)
+
+        if self.reward_plan is None or not self.reward_plan.is_current(self.reward_functions, self.weight_configurations):
+            previous_plan = self.reward_plan
+            self.reward_plan = RewardPlan(self.reward_functions, self.weight_configurations)
+            # Statistics of rewards that are still there under the same name carry over
+            if previous_plan is None:
+                self.reward_stats = RewardStats(len(self.reward_functions))
+            elif previous_plan.reward_functions != self.reward_plan.reward_functions:
+                self.reward_stats = self.reward_stats.remapped(previous_plan.reward_names, self.reward_plan.reward_names)
+            # Cumulative rewards have one value per configuration
+            if previous_plan is not None and previous_plan.configuration_names != self.reward_plan.configuration_names:
+                self.reset_rewards()
+            if self.profiler is not None:
+                self.profiler.set_rewards(self.reward_plan.reward_names)
+        if self.round_needs_reset:
+            self.round_needs_reset = False
+            self.reward_plan.reset(self.game_state)
+        durations = self.profiler.reward_durations if self.profiler is not None else None
+        component_rewards = self.reward_plan.get_reward_matrix(self.game_state, durations)
+        self.reward_stats.update(component_rewards, self.reward_plan.active_mask)
+        self.component_rewards = component_rewards
+        return component_rewards @ self.reward_plan.weight_matrix
 
     def handle_input_change(self, change: PlayerInputChange, seconds: float, frame_num: int):
         player_index = change.PlayerIndex()
         controller_state = change.ControllerState()
 
-        global_player_data[player_index].car_id = player_index
-        global_player_data[player_index]._steer_input = controller_state.Steer()
-        global_player_data[player_index]._throttle_input = controller_state.Throttle()
-        global_player_data[player_index]._pitch_input = controller_state.Pitch()
-        global_player_data[player_index]._roll_input = controller_state.Roll()
-        global_player_data[player_index]._jump_input = controller_state.Jump()
-        global_player_data[player_index]._boost_input = controller_state.Boost()
-        global_player_data[player_index]._handbrake_input = controller_state.Handbrake()
-        global_player_data[player_index]._use_item_input = controller_state.UseItem()
+        self.player_inputs.write(player_index, controller_state.Steer(), controller_state.Throttle(), controller_state.Pitch(),
+                                 controller_state.Roll(), controller_state.Jump(), controller_state.Boost(),
+                                 controller_state.Handbrake(), controller_state.UseItem())
 
     def start(self):
         print("Connecting SocketRelay...")
@@ -168,109 +283,213 @@ class RewardTester(BaseScript):
         self.socket_relay_thread.start()
         print("SocketRelay connected and running")
 
+        if self.record_trace_path is not None:
+            self.trace_writer = TraceWriter(self.record_trace_path, self.tick_skip)
+            print(f"Recording trace to {self.record_trace_path}")
+
+        if self.telemetry_directory is not None:
+            self.telemetry_exporter = TelemetryExporter(self.telemetry_directory)
+            print(f"Exporting reward telemetry to {self.telemetry_directory}")
+
+        if self.enable_profiling:
+            self.profiler = Profiler(self.tick_skip / 120)
+
+        self.overlay = TextOverlay(self.game_interface.renderer, self.renderer, self.max_renders_per_second)
+
+        if self.weights_path is not None:
+            # The weights file may have been set after the rewards were built in __init__
+            self.reward_functions = self.build_reward_functions()
+        if self.reload_on_file_change:
+            self.file_watcher = FileWatcher([reward_functions_module.__file__, self.weights_path])
+
+        try:
+            self.run()
+        finally:
+            if self.trace_writer is not None:
+                self.trace_writer.close()
+            if self.telemetry_exporter is not None:
+                dropped_rows = self.telemetry_exporter.close()
+                if dropped_rows:
+                    self.console_writer.write(f"Telemetry export fell behind and dropped {dropped_rows} rows\n", droppable=False)
+            if self.profiler is not None and self.profile_export_path is not None:
+                self.profiler.export(self.profile_export_path)
+            self.console_writer.close()
+
+    def run(self):
         while True:
+            if self.reset_requested:
+                self.reset_requested = False
+                self.reset_rewards()
+
             # Wait for a packet
+            wait_start = time.perf_counter()
             packet = self.wait_game_tick_packet()
+            if self.profiler is not None:
+                self.profiler.add('packet_wait', time.perf_counter() - wait_start)
 
-            if not packet.game_info.is_round_active:
-                self.reset_game_state(packet)
+            # Game frames since the previous packet, more than 1 when packets were missed
+            frames_elapsed = self.frame_stepper.advance(packet.game_info.frame_num)
+            if frames_elapsed == 0:
+                continue
+
+            if self.trace_writer is not None:
+                self.trace_writer.write(packet, self.player_inputs.latest)
+
+            # A goal is scored right away as the last step of its round, the rewards reset in the first step after it.
+            # Any other event resets them in the next scored step, so no per-car state leaks into the new round.
+            round_event = self.round_tracker.update(packet)
+            is_goal = round_event == GOAL
+            if round_event is not None and not is_goal:
+                self.round_needs_reset = True
+
+            if not packet.game_info.is_round_active and not is_goal:
+                self.game_state.update_counters(packet, frames_elapsed)
                 self.clear_text_if_expired()
                 continue
 
-            self.ticks += 1
-            if self.ticks < self.tick_skip:
+            # Only the packet completing every tick_skip frames is decoded and scored, and the packet of a goal
+            if not self.frame_stepper.is_step(frames_elapsed, force=is_goal):
+                self.game_state.update_counters(packet, frames_elapsed)
+                # Text held back by the render rate cap goes out as soon as it is allowed to
+                self.overlay.flush()
                 continue
-            self.ticks = 0
 
-            print("--------------------------")
-            self.game_state.decode(packet)
-            self.reset_game_state(packet)
+            # Only two mtime checks, polled here so saving a file reloads even without a working keyboard hook
+            if self.file_watcher is not None and self.file_watcher.changed():
+                self.reload_requested = True
+            if self.reload_requested:
+                self.reload_requested = False
+                self.reload_rewards()
+
+            step_start = time.perf_counter()
+            self.game_state.decode(packet, frames_elapsed)
+            decoded = time.perf_counter()
 
             if self.players_to_render is None:
                 self.players_to_render = list(range(len(self.game_state.players)))
-            step_reward = 0
-            player_rewards = []
-            for player_data in self.game_state.players:
-                player_reward = self.calculate_reward(player_data)
-                step_reward += player_reward
-                player_rewards.append(player_reward)
-
+            # Every reward value below is an array with one entry per weight configuration
+            player_rewards = self.calculate_rewards()
+            if is_goal:
+                self.round_needs_reset = True
+            rewarded = time.perf_counter()
+            step_reward = player_rewards.sum(axis=0)
+            for player_data, player_reward in zip(self.game_state.players, player_rewards):
                 if player_data.car_id not in self.player_rewards:
                     self.player_rewards[player_data.car_id] = {'current_reward': 0, 'average_step_reward': 0, 'total_reward': 0}
 
                 self.player_rewards[player_data.car_id]['current_reward'] = player_reward
                 self.player_rewards[player_data.car_id]['total_reward'] += player_reward
 
-                # Check if the player should be printed
-                if self.print_individual_rewards and (self.players_to_print is None or player_data.car_id in self.players_to_print):
-                    print(f"Player {player_data.car_id} current reward: {self.player_rewards[player_data.car_id]['current_reward']:.6f}")
-                    print(f"Player {player_data.car_id} average step reward: {self.player_rewards[player_data.car_id]['average_step_reward']:.6f}")
-
             self.total_step_reward += step_reward
             self.num_steps += 1
+
+            if self.telemetry_exporter is not None:
+                self.telemetry_exporter.write_step(self.num_steps, packet.game_info.frame_num, packet.game_info.seconds_elapsed,
+                                                   self.game_state.team_nums, self.component_rewards,
+                                                   self.reward_plan.weights, self.reward_plan.reward_names,
+                                                   player_rewards, self.reward_plan.configuration_names,
+                                                   self.reward_plan.active_mask)
             self.total_average_step_reward = self.total_step_reward / self.num_steps
             self.total_cumulative_reward = sum(player_reward['total_reward'] for player_reward in self.player_rewards.values()) / len(self.game_state.players)
 
             for player_id, player_data in self.player_rewards.items():
                 player_data['average_step_reward'] = player_data['total_reward'] / self.num_steps
+            aggregated = time.perf_counter()
+
+            self.print_report(step_reward)
+            printed = time.perf_counter()
+
+            self.render_all_text(step_reward)
+
+            if self.profiler is not None:
+                step_end = time.perf_counter()
+                self.profiler.add('decode', decoded - step_start)
+                self.profiler.add('rewards', rewarded - decoded)
+                self.profiler.add('aggregation', aggregated - rewarded)
+                self.profiler.add('print', printed - aggregated)
+                self.profiler.add('render', step_end - printed)
+                if self.profiler.end_step(self.num_steps, step_end - step_start) and self.print_budget_overruns:
+                    slowest = ", ".join(f"{name} {mean * 1e6:.0f} us" for name, mean, _ in self.profiler.slowest_rewards(self.profile_top_n))
+                    self.console_writer.write(f"Step {self.num_steps} took {(step_end - step_start) * 1000:.3f} ms, over the {self.profiler.budget * 1000:.1f} ms budget. Slowest rewards: {slowest}\n", droppable=False)
+
+    def format_rewards(self, rewards) -> str:
+        # The default weighting, followed by every extra weight configuration by name
+        text = f"{rewards[0]:.6f}"
+        for name, reward in zip(self.reward_plan.configuration_names[1:], rewards[1:]):
+            text += f" | {name}: {reward:.6f}"
+        return text
+
+    def print_report(self, step_reward):
+        # The whole step is handed to the console thread as one string, so the loop never waits on the console
+        if self.num_steps % self.print_every_n_steps != 0:
+            return
+
+        lines = ["--------------------------"]
+        # Check which players should be printed
+        if self.print_individual_rewards:
+            for player_data in self.game_state.players:
+                if self.players_to_print is None or player_data.car_id in self.players_to_print:
+                    lines.append(f"Player {player_data.car_id} current reward: {self.format_rewards(self.player_rewards[player_data.car_id]['current_reward'])}")
+                    lines.append(f"Player {player_data.car_id} average step reward: {self.format_rewards(self.player_rewards[player_data.car_id]['average_step_reward'])}")
 
-            if self.print_individual_total_rewards:
-                for player_id, player_data in self.player_rewards.items():
-                    if self.players_to_print is None or player_id in self.players_to_print:
-                        print(f"Player {player_id} total reward: {player_data['total_reward']:.6f}")
-
-            if self.print_general_rewards:
-                print(f"Total step reward: {step_reward:.6f}")
-                print(f"Total average step reward: {self.total_average_step_reward:.6f}")
-                print(f"Total cumulative reward: {self.total_cumulative_reward:.6f}")
-
-            # Append the individual player data to the render queue
-            if self.enable_individual_reward_rendering:
-                for player_id in self.players_to_render:
-                    if player_id in self.player_rewards:
-                        self.render_text_queue.append(f"Player {player_id} current reward: {self.player_rewards[player_id]['current_reward']:.6f}\n")
-                        self.render_text_queue.append(f"Player {player_id} average step reward: {self.player_rewards[player_id]['average_step_reward']:.6f}\n")
-                        self.render_text_queue.append(f"Player {player_id} total reward: {self.player_rewards[player_id]['total_reward']:.6f}\n")
-            # Append the general reward text to the render queue
-            if self.enable_general_reward_rendering:
-                self.render_text_queue.append(f"Total step reward: {step_reward:.6f}\n")
-                self.render_text_queue.append(f"Total average step reward: {self.total_average_step_reward:.6f}\n")
-                self.render_text_queue.append(f"Total cumulative reward: {self.total_cumulative_reward:.6f}\n")
-
-            self.render_all_text()
-
-            print("--------------------------")
-
-    def render_all_text(self):
-        if self.enable_rendering and self.render_text_queue:
-            self.game_interface.renderer.begin_rendering()
-            y_offset = 30
-            x_offset = 20
-            render_count = 0
-            total_text = len(self.render_text_queue)-(self.enable_general_reward_rendering)*3
-            if total_text > 0:
-                for text in self.render_text_queue:
-                    self.game_interface.renderer.draw_string_2d(x_offset, y_offset, 1, 1, text, self.renderer.lime())
-                    y_offset += 30
-                    render_count += 1
-                    if render_count % ((total_text) // 2) == 0:
-                        if x_offset == 20:
-                            x_offset = 1500
-                            y_offset -= 30*((total_text) // 2)
-                        else:
-                            x_offset = 20
-            self.game_interface.renderer.end_rendering()
-            self.last_render_time = time.time()
-            self.render_text_queue.clear()  # Clear the render queue after rendering
-
-    def reset_game_state(self, packet):
-        self.game_state.decode(packet)
+        if self.print_individual_total_rewards:
+            for player_id, player_data in self.player_rewards.items():
+                if self.players_to_print is None or player_id in self.players_to_print:
+                    lines.append(f"Player {player_id} total reward: {self.format_rewards(player_data['total_reward'])}")
+
+        if self.print_general_rewards:
+            lines.append(f"Total step reward: {self.format_rewards(step_reward)}")
+            lines.append(f"Total average step reward: {self.format_rewards(self.total_average_step_reward)}")
+            lines.append(f"Total cumulative reward: {self.format_rewards(self.total_cumulative_reward)}")
+            lines.append(f"Skipped frames: {self.frame_stepper.skipped_frames} ({self.frame_stepper.skipped_steps} whole steps)")
+
+        if self.print_reward_stats_every_n_steps and self.num_steps % self.print_reward_stats_every_n_steps == 0:
+            lines.extend(self.reward_stats.format_lines(self.reward_plan.reward_names, self.players_to_print))
+        lines.append("--------------------------")
+
+        report = "\n".join(lines) + "\n"
+        if self.print_only_on_change and report == self.last_report:
+            return
+        self.last_report = report
+        self.console_writer.write(report)
+
+    def render_all_text(self, step_reward):
+        # Each block of lines is drawn with a single draw call, the overlay skips sending unchanged text
+        if not self.enable_rendering:
+            return
+        blocks = []
+        general_y_offset = 30
+        if self.enable_individual_reward_rendering:
+            player_texts = [
+                f"Player {player_id} current reward: {self.format_rewards(self.player_rewards[player_id]['current_reward'])}\n"
+                f"Player {player_id} average step reward: {self.format_rewards(self.player_rewards[player_id]['average_step_reward'])}\n"
+                f"Player {player_id} total reward: {self.format_rewards(self.player_rewards[player_id]['total_reward'])}\n"
+                for player_id in self.players_to_render if player_id in self.player_rewards
+            ]
+            # Half of the players on the left side of the screen, the other half on the right side
+            left_count = (len(player_texts) + 1) // 2
+            if left_count:
+                blocks.append((20, 30, "".join(player_texts[:left_count]), 'lime'))
+            if len(player_texts) > left_count:
+                blocks.append((1500, 30, "".join(player_texts[left_count:]), 'lime'))
+            general_y_offset += 90 * left_count
+        if self.enable_general_reward_rendering:
+            blocks.append((20, general_y_offset,
+                           f"Total step reward: {self.format_rewards(step_reward)}\n"
+                           f"Total average step reward: {self.format_rewards(self.total_average_step_reward)}\n"
+                           f"Total cumulative reward: {self.format_rewards(self.total_cumulative_reward)}\n", 'lime'))
+        if self.render_profile and self.profiler is not None:
+            blocks.append((700, 30, "".join(self.profiler.format_lines(self.profile_top_n)), 'yellow'))
+
+        self.overlay.update(blocks)
+        self.last_render_time = time.time()
 
     def clear_text_if_expired(self):
+        # Clearing sends one empty group, after that the overlay has nothing left to change
         if self.enable_rendering and time.time() - self.last_render_time > self.render_duration:
-            self.game_interface.renderer.begin_rendering()
-            self.game_interface.renderer.draw_string_2d(20, 100, 1, 1, "", self.renderer.lime())
-            self.game_interface.renderer.end_rendering()
+            self.overlay.clear()
+        else:
+            self.overlay.flush()
 
 if __name__ == "__main__":
     reward_tester = RewardTester()
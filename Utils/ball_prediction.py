@@ -0,0 +1,133 @@
+import numpy as np
+
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction, MAX_SLICES
+
+from .common_values import SIDE_WALL_X, BACK_WALL_Y, BACK_NET_Y, CEILING_Z, BALL_RADIUS, GOAL_HEIGHT, GOAL_CENTER_TO_POST, CAR_MAX_SPEED
+
+# Memory layout of rlbot's Slice: physics rows (location, rotation, velocity, angular velocity), then game_seconds
+SLICE_DTYPE = np.dtype([('physics', np.float32, (4, 3)), ('game_seconds', np.float32)])
+
+GRAVITY_Z = -650.0
+BOUNCE_RESTITUTION = 0.6
+ROLLING_SPEED_Z = 50.0  # A floor bounce slower than this leaves the ball rolling
+
+
+class BallTrajectory:
+    # Predicted ball path as arrays of (time, position, velocity), times are seconds from the decoded packet.
+    # GameState.ball_prediction fills it at most once per step, either from rlbot's BallPrediction struct or,
+    # when there is none (headless runs, replays), from a ballistic stand-in without drag, spin or car touches.
+    def __init__(self, num_slices: int = MAX_SLICES, slice_seconds: float = 1 / 60):
+        self.slice_seconds = slice_seconds
+        self._times = np.zeros(num_slices)
+        self._positions = np.zeros((num_slices, 3))
+        self._velocities = np.zeros((num_slices, 3))
+        self.num_slices = 0
+        self.from_game = False  # True if the last update read the game's prediction
+        self._goal_times = None
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[:self.num_slices]
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions[:self.num_slices]
+
+    @property
+    def velocities(self) -> np.ndarray:
+        return self._velocities[:self.num_slices]
+
+    def read_struct(self, ball_prediction: BallPrediction, seconds_elapsed: float):
+        slices = np.frombuffer(ball_prediction.slices, dtype=SLICE_DTYPE)[:ball_prediction.num_slices]
+        self.num_slices = len(slices)
+        np.subtract(slices['game_seconds'], seconds_elapsed, out=self._times[:self.num_slices])
+        np.copyto(self._positions[:self.num_slices], slices['physics'][:, 0])
+        np.copyto(self._velocities[:self.num_slices], slices['physics'][:, 2])
+        self.from_game = True
+        self._goal_times = None
+
+    def simulate(self, position: np.ndarray, velocity: np.ndarray):
+        # Fills all slices from the current ball state. Between two bounces the path is a parabola, so every
+        # segment is evaluated for all of its slices at once and only the few bounces are stepped in Python.
+        num_slices = len(self._times)
+        self.num_slices = num_slices
+        self._times[:] = np.arange(1, num_slices + 1) * self.slice_seconds
+        self.from_game = False
+        self._goal_times = None
+
+        position = np.array(position, dtype=np.float64)
+        velocity = np.array(velocity, dtype=np.float64)
+        start_time = 0.0
+        first_slice = 0
+        rolling = position[2] <= BALL_RADIUS and abs(velocity[2]) < ROLLING_SPEED_Z
+        while first_slice < num_slices:
+            gravity = 0.0 if rolling else GRAVITY_Z
+            if rolling:
+                position[2] = BALL_RADIUS
+                velocity[2] = 0.0
+            bounce_time, axis = self._next_bounce(position, velocity, gravity)
+            end_slice = int(np.searchsorted(self._times, start_time + bounce_time, side='right'))
+            if end_slice > first_slice:
+                elapsed = self._times[first_slice:end_slice, None] - start_time
+                acceleration = np.array((0.0, 0.0, gravity))
+                self._positions[first_slice:end_slice] = position + velocity * elapsed + 0.5 * acceleration * elapsed ** 2
+                self._velocities[first_slice:end_slice] = velocity + acceleration * elapsed
+                first_slice = end_slice
+            if first_slice >= num_slices:
+                break
+
+            position += velocity * bounce_time
+            position[2] += 0.5 * gravity * bounce_time ** 2
+            velocity[2] += gravity * bounce_time
+            start_time += bounce_time
+            velocity[axis] *= -BOUNCE_RESTITUTION
+            if axis == 2 and position[2] < CEILING_Z / 2 and velocity[2] < ROLLING_SPEED_Z:
+                rolling = True
+
+    @staticmethod
+    def _next_bounce(position, velocity, gravity):
+        # Time until the ball hits the next wall, floor or ceiling and the axis it bounces on
+        limits = np.array((SIDE_WALL_X, BACK_WALL_Y, 0.0)) - BALL_RADIUS
+        times = np.full(3, np.inf)
+        for axis in range(2):
+            if velocity[axis] != 0:
+                times[axis] = max((np.sign(velocity[axis]) * limits[axis] - position[axis]) / velocity[axis], 0.0)
+        if np.isfinite(times[1]):
+            # Balls inside the goal mouth only stop at the back of the net
+            x = position[0] + velocity[0] * times[1]
+            z = position[2] + velocity[2] * times[1] + 0.5 * gravity * times[1] ** 2
+            if abs(x) < GOAL_CENTER_TO_POST - BALL_RADIUS and z < GOAL_HEIGHT - BALL_RADIUS:
+                times[1] = max((np.sign(velocity[1]) * (BACK_NET_Y - BALL_RADIUS) - position[1]) / velocity[1], 0.0)
+
+        if gravity != 0:
+            # Solve z(t) = floor or ceiling height for the first t > 0
+            height = position[2] - BALL_RADIUS
+            times[2] = (velocity[2] + np.sqrt(velocity[2] ** 2 - 2 * gravity * max(height, 0.0))) / -gravity
+            ceiling_discriminant = velocity[2] ** 2 + 2 * gravity * (CEILING_Z - BALL_RADIUS - position[2])
+            if velocity[2] > 0 and ceiling_discriminant >= 0:
+                times[2] = (velocity[2] - np.sqrt(ceiling_discriminant)) / -gravity
+        axis = int(np.argmin(times))
+        return max(times[axis], 1e-6), axis
+
+    def index_at(self, seconds: float) -> int:
+        # Index of the first slice at or after seconds from now, clamped to the last slice
+        return min(int(np.searchsorted(self.times, seconds)), self.num_slices - 1)
+
+    @property
+    def goal_times(self) -> np.ndarray:
+        # Seconds until the ball is fully behind the blue [0] and the orange [1] goal line, inf if not predicted
+        if self._goal_times is None:
+            self._goal_times = np.full(2, np.inf)
+            y = self.positions[:, 1]
+            for team, crossed in enumerate((y < -BACK_WALL_Y - BALL_RADIUS, y > BACK_WALL_Y + BALL_RADIUS)):
+                if crossed.any():
+                    self._goal_times[team] = self.times[np.argmax(crossed)]
+        return self._goal_times
+
+    def intercepts(self, car_positions: np.ndarray, car_speed: float = CAR_MAX_SPEED):
+        # First slice every car can reach in a straight line at car_speed, and the car's distance to it.
+        # Cars that reach no slice in time get index -1 and the distance to the last slice.
+        distances = np.linalg.norm(car_positions[:, None, :] - self.positions[None, :, :], axis=2)
+        reachable = distances <= self.times * car_speed
+        indices = np.where(reachable.any(axis=1), np.argmax(reachable, axis=1), -1)
+        return indices, distances[np.arange(len(distances)), indices]
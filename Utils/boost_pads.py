@@ -0,0 +1,44 @@
+import numpy as np
+
+from .common_values import BOOST_LOCATIONS
+
+# Memory layout of rlbot's BoostPadState, so packet.game_boosts can be read as one array without copying
+BOOST_PAD_DTYPE = np.dtype([('is_active', np.bool_), ('timer', np.float32)], align=True)
+
+
+def boost_pad_states(packet) -> np.ndarray:
+    # Zero-copy structured view of the boost pads in a GameTickPacket
+    return np.frombuffer(packet.game_boosts, dtype=BOOST_PAD_DTYPE)[:packet.num_boost]
+
+
+class BoostPadIndex:
+    # Pad positions of the standard field for proximity queries of all cars at once. Queries take a
+    # (cars, pads) distance matrix, GameState.features.pad_distances computes it once per step.
+    # With 34 pads the dense matrix is a single array operation and beats walking a tree or grid.
+    def __init__(self, positions=BOOST_LOCATIONS):
+        self.positions = np.array(positions, dtype=np.float64)
+        self.is_big = self.positions[:, 2] > 71.0  # Big pads sit at z = 73, small ones at z = 70
+        self.inverted_positions = self.positions[::-1]  # Pads are listed so that reversing them mirrors the field
+
+    def distances(self, car_positions: np.ndarray) -> np.ndarray:
+        # (cars, pads) distances from every car to every pad
+        return np.linalg.norm(car_positions[:, None, :] - self.positions[None, :, :], axis=2)
+
+    def nearest(self, distances: np.ndarray, available: np.ndarray = None):
+        # Index of and distance to the closest pad of every car, only counting available pads if given
+        # (e.g. the active ones, or active & is_big). Cars without any available pad get index -1 and distance inf.
+        if available is not None:
+            distances = np.where(available, distances, np.inf)
+        indices = np.argmin(distances, axis=1)
+        nearest_distances = distances[np.arange(len(distances)), indices]
+        return np.where(np.isfinite(nearest_distances), indices, -1), nearest_distances
+
+    def within(self, distances: np.ndarray, radius: float, available: np.ndarray = None) -> np.ndarray:
+        # (cars, pads) mask of the pads within radius of every car
+        mask = distances <= radius
+        if available is not None:
+            mask &= available
+        return mask
+
+
+BOOST_PAD_INDEX = BoostPadIndex()
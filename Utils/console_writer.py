@@ -0,0 +1,47 @@
+import sys
+import threading
+from collections import deque
+
+
+class ConsoleWriter:
+    # Writes text on a background thread so the caller never blocks on a slow console.
+    # Text is written in order. When the console falls behind, queued droppable text (step reports) is replaced by newer
+    # droppable text, as long as nothing else was queued in between. Text written with droppable=False is always written.
+    def __init__(self):
+        self.queue = deque()  # (text, droppable) items, None stops the thread
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def write(self, text: str, droppable: bool = True):
+        with self.condition:
+            # Only the newest of consecutive reports is worth showing
+            if droppable and self.queue and self.queue[-1] is not None and self.queue[-1][1]:
+                self.queue[-1] = (text, droppable)
+                self.dropped += 1
+            else:
+                self.queue.append((text, droppable))
+            self.condition.notify()
+
+    def close(self, timeout: float = 1.0):
+        # Lets the queued text out before stopping the thread
+        with self.condition:
+            self.queue.append(None)
+            self.condition.notify()
+        self.thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.queue:
+                    self.condition.wait()
+                item = self.queue.popleft()
+            if item is None:
+                return
+            self._write(item[0])
+
+    def _write(self, text: str):
+        # sys.stdout is looked up every time so redirections made after construction are respected
+        sys.stdout.write(text)
+        sys.stdout.flush()
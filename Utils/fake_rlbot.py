@@ -0,0 +1,310 @@
+import time
+import threading
+import numpy as np
+
+from rlbot.agents.base_script import BaseScript
+from rlbot.utils.logging_utils import get_logger
+from rlbot.utils.structures.ball_prediction_struct import BallPrediction
+from rlbot.utils.structures.game_data_struct import GameTickPacket, FieldInfoPacket
+
+from .common_values import SIDE_WALL_X, BACK_WALL_Y, CEILING_Z, BALL_RADIUS, BOOST_LOCATIONS, CAR_MAX_SPEED, BALL_MAX_SPEED
+from .trace import TraceReader, INPUT_CHANNELS
+
+
+class PacketSourceExhausted(Exception):
+    pass
+
+
+class NullRenderer:
+    # Stands in for both game_interface.renderer and the script's rendering manager, only counting calls
+    def __init__(self):
+        self.render_groups = 0
+        self.draw_calls = 0
+
+    def begin_rendering(self, group_id='default'):
+        pass
+
+    def end_rendering(self):
+        self.render_groups += 1
+
+    def clear_screen(self, group_id='default'):
+        self.render_groups += 1
+
+    def draw_string_2d(self, x, y, scale_x, scale_y, text, color):
+        self.draw_calls += 1
+
+    def __getattr__(self, name):
+        # Colors and any other draw_* call
+        if name.startswith('draw_'):
+            return self._count_draw_call
+        return lambda *args, **kwargs: None
+
+    def _count_draw_call(self, *args, **kwargs):
+        self.draw_calls += 1
+
+
+class FakeGameInterface:
+    def __init__(self):
+        self.renderer = NullRenderer()
+
+
+class FakeControllerState:
+    def __init__(self, controls):
+        self.controls = controls
+
+    def Steer(self):
+        return self.controls[0]
+
+    def Throttle(self):
+        return self.controls[1]
+
+    def Pitch(self):
+        return self.controls[2]
+
+    def Roll(self):
+        return self.controls[3]
+
+    def Jump(self):
+        return bool(self.controls[4])
+
+    def Boost(self):
+        return bool(self.controls[5])
+
+    def Handbrake(self):
+        return bool(self.controls[6])
+
+    def UseItem(self):
+        return bool(self.controls[7])
+
+
+class FakePlayerInputChange:
+    def __init__(self, player_index, controls):
+        self.player_index = player_index
+        self.controller_state = FakeControllerState(controls)
+
+    def PlayerIndex(self):
+        return self.player_index
+
+    def ControllerState(self):
+        return self.controller_state
+
+
+class FakeSocketRelay:
+    # Same handler lists as SocketRelay, but input changes are dispatched by the packet source instead of a socket
+    def __init__(self):
+        self.player_input_change_handlers = []
+        self.on_connect_handlers = []
+        self.is_connected = False
+        self._stop_event = threading.Event()
+
+    def connect_and_run(self, wants_quick_chat, wants_game_messages, wants_ball_predictions):
+        self.is_connected = True
+        for handler in self.on_connect_handlers:
+            handler()
+        self._stop_event.wait()
+        self.is_connected = False
+
+    def disconnect(self):
+        self._stop_event.set()
+
+    def dispatch_input_change(self, player_index, controls, seconds, frame_num):
+        change = FakePlayerInputChange(player_index, controls)
+        for handler in self.player_input_change_handlers:
+            handler(change, seconds, frame_num)
+
+
+class RandomPacketSource:
+    # Randomized but physically plausible play for num_cars cars, filled into one GameTickPacket in place
+    def __init__(self, num_cars=6, num_ticks=None, seed=0, input_change_rate=0.1):
+        self.num_cars = num_cars
+        self.num_ticks = num_ticks
+        self.input_change_rate = input_change_rate
+        self.rng = np.random.default_rng(seed)
+        self.packet = GameTickPacket()
+        self.frame_num = 0
+        self.input_changes = []
+
+        self.car_positions = np.column_stack((
+            self.rng.uniform(-SIDE_WALL_X + 500, SIDE_WALL_X - 500, num_cars),
+            self.rng.uniform(-BACK_WALL_Y + 500, BACK_WALL_Y - 500, num_cars),
+            np.full(num_cars, 17.0),
+        ))
+        self.car_velocities = np.zeros((num_cars, 3))
+        self.car_rotations = np.zeros((num_cars, 3))
+        self.car_boosts = np.full(num_cars, 33.0)
+        self.ball_position = np.array([0.0, 0.0, BALL_RADIUS])
+        self.ball_velocity = np.zeros(3)
+
+        packet = self.packet
+        packet.num_cars = num_cars
+        packet.num_boost = len(BOOST_LOCATIONS)
+        packet.num_teams = 2
+        packet.game_info.is_round_active = True
+        packet.game_info.world_gravity_z = -650.0
+        packet.game_info.game_speed = 1.0
+        for i in range(num_cars):
+            packet.game_cars[i].team = i % 2
+            packet.game_cars[i].is_bot = True
+        for i in range(packet.num_boost):
+            packet.game_boosts[i].is_active = True
+
+    def next_packet(self) -> GameTickPacket:
+        if self.num_ticks is not None and self.frame_num >= self.num_ticks:
+            raise PacketSourceExhausted()
+        self.frame_num += 1
+        dt = 1 / 120
+        rng = self.rng
+        num_cars = self.num_cars
+
+        # Cars steer towards the ball with some noise, jump now and then
+        to_ball = self.ball_position - self.car_positions
+        to_ball[:, 2] = 0
+        to_ball /= np.maximum(np.linalg.norm(to_ball, axis=1), 1)[:, None]
+        self.car_velocities += (to_ball * 1000 + rng.normal(0, 400, (num_cars, 3)) * [1, 1, 0]) * dt
+        jumping = (self.car_positions[:, 2] < 20) & (rng.random(num_cars) < 0.005)
+        self.car_velocities[jumping, 2] += 600
+        self.car_velocities[:, 2] -= 650 * dt
+        speeds = np.linalg.norm(self.car_velocities, axis=1)
+        self.car_velocities *= np.minimum(1, CAR_MAX_SPEED / np.maximum(speeds, 1))[:, None]
+        self.car_positions += self.car_velocities * dt
+        on_ground = self.car_positions[:, 2] <= 17
+        self.car_positions[on_ground, 2] = 17
+        self.car_velocities[on_ground, 2] = np.maximum(self.car_velocities[on_ground, 2], 0)
+        self._bounce(self.car_positions, self.car_velocities, 17)
+        self.car_rotations[:, 1] = np.arctan2(self.car_velocities[:, 1], self.car_velocities[:, 0])
+        self.car_rotations[:, 0] = np.where(on_ground, 0, self.car_rotations[:, 0] + rng.normal(0, 0.05, num_cars))
+        self.car_rotations[:, 2] = np.where(on_ground, 0, self.car_rotations[:, 2] + rng.normal(0, 0.05, num_cars))
+        self.car_boosts = np.clip(self.car_boosts + rng.normal(0, 1, num_cars), 0, 100)
+
+        # Ball falls and bounces, touching cars hit it away
+        self.ball_velocity[2] -= 650 * dt
+        self.ball_position += self.ball_velocity * dt
+        if self.ball_position[2] < BALL_RADIUS:
+            self.ball_position[2] = BALL_RADIUS
+            self.ball_velocity[2] = abs(self.ball_velocity[2]) * 0.6
+        self._bounce(self.ball_position[None], self.ball_velocity[None], BALL_RADIUS)
+        distances = np.linalg.norm(self.car_positions - self.ball_position, axis=1)
+        touching = np.flatnonzero(distances < 150)
+
+        packet = self.packet
+        game_info = packet.game_info
+        game_info.frame_num = self.frame_num
+        game_info.seconds_elapsed = self.frame_num * dt
+        if len(touching):
+            toucher = int(touching[0])
+            self.ball_velocity += self.car_velocities[toucher] * 1.5 + [0, 0, 300]
+            self.ball_velocity *= min(1, BALL_MAX_SPEED / max(np.linalg.norm(self.ball_velocity), 1))
+            packet.game_ball.latest_touch.player_index = toucher
+            packet.game_ball.latest_touch.time_seconds = game_info.seconds_elapsed
+            packet.game_ball.latest_touch.team = toucher % 2
+
+        self._fill_physics(packet.game_ball.physics, self.ball_position, np.zeros(3), self.ball_velocity, np.zeros(3))
+        for i in range(num_cars):
+            player_info = packet.game_cars[i]
+            self._fill_physics(player_info.physics, self.car_positions[i], self.car_rotations[i], self.car_velocities[i], np.zeros(3))
+            player_info.has_wheel_contact = bool(on_ground[i])
+            player_info.jumped = not on_ground[i] and (player_info.jumped or bool(jumping[i]))
+            player_info.double_jumped = False
+            player_info.boost = int(self.car_boosts[i])
+
+        self.input_changes = []
+        for i in np.flatnonzero(rng.random(num_cars) < self.input_change_rate).tolist():
+            controls = rng.uniform(-1, 1, len(INPUT_CHANNELS))
+            controls[4:] = controls[4:] > 0
+            self.input_changes.append((i, controls.tolist()))
+
+        return packet
+
+    @staticmethod
+    def _bounce(positions, velocities, radius):
+        limits = np.array([SIDE_WALL_X - radius, BACK_WALL_Y - radius, CEILING_Z - radius])
+        outside = positions > limits
+        velocities[outside] = -np.abs(velocities[outside])
+        outside = positions[:, :2] < -limits[:2]
+        velocities[:, :2][outside] = np.abs(velocities[:, :2][outside])
+        np.clip(positions, -limits, limits, out=positions)
+
+    @staticmethod
+    def _fill_physics(physics, position, rotation, velocity, angular_velocity):
+        physics.location.x, physics.location.y, physics.location.z = position.tolist()
+        physics.rotation.pitch, physics.rotation.yaw, physics.rotation.roll = rotation.tolist()
+        physics.velocity.x, physics.velocity.y, physics.velocity.z = velocity.tolist()
+        physics.angular_velocity.x, physics.angular_velocity.y, physics.angular_velocity.z = angular_velocity.tolist()
+
+
+class TracePacketSource:
+    # Scripted play from a recorded trace, input changes are emitted whenever a car's recorded inputs change
+    def __init__(self, path):
+        self.reader = TraceReader(path)
+        self.packet = self.reader.packet
+        self.iterator = iter(self.reader)
+        self.previous_inputs = {}
+        self.input_changes = []
+
+    def next_packet(self) -> GameTickPacket:
+        try:
+            packet, inputs = next(self.iterator)
+        except StopIteration:
+            raise PacketSourceExhausted()
+
+        self.input_changes = []
+        for i, controls in enumerate(inputs.tolist()):
+            if self.previous_inputs.get(i) != controls:
+                self.previous_inputs[i] = controls
+                self.input_changes.append((i, controls))
+        return packet
+
+
+class HeadlessScript(BaseScript):
+    # A BaseScript that never touches the game: packets come from packet_source, rendering goes nowhere
+    def __init__(self, name):
+        # BaseScript.__init__ loads the RLBot interface, so it is deliberately not called
+        self.name = name
+        self.logger = get_logger(name)
+        self.game_tick_packet = GameTickPacket()
+        self.ball_prediction = BallPrediction()
+        self.game_interface = FakeGameInterface()
+        self.renderer = self.game_interface.renderer
+        self.fake_socket_relay = FakeSocketRelay()
+        if not hasattr(self, 'packet_source'):
+            self.packet_source = RandomPacketSource()
+        self.realtime = getattr(self, 'realtime', False)
+        self.drop_rate = getattr(self, 'drop_rate', 0.0)  # Chance that a packet is missed, like a script that lags behind
+        self._drop_rng = np.random.default_rng(0)
+        self.tick_durations = []
+        self._last_packet_time = None
+
+    def wait_game_tick_packet(self):
+        # Time spent since the previous packet was handed out is the time the script took to process it
+        now = time.perf_counter()
+        if self._last_packet_time is not None:
+            self.tick_durations.append(now - self._last_packet_time)
+            if self.realtime:
+                time.sleep(max(0.0, self._last_packet_time + 1 / 120 - now))
+
+        packet = self._next_packet()
+        # A missed packet still moved the game on, the next one arrives with a higher frame_num
+        while self.drop_rate and self._drop_rng.random() < self.drop_rate:
+            packet = self._next_packet()
+
+        self._last_packet_time = time.perf_counter()
+        return packet
+
+    def _next_packet(self):
+        packet = self.packet_source.next_packet()
+        game_info = packet.game_info
+        for player_index, controls in self.packet_source.input_changes:
+            self.fake_socket_relay.dispatch_input_change(player_index, controls, game_info.seconds_elapsed, game_info.frame_num)
+        return packet
+
+    def get_game_tick_packet(self):
+        return self.packet_source.packet
+
+    def get_field_info(self):
+        return FieldInfoPacket()
+
+    def get_ball_prediction_struct(self) -> BallPrediction:
+        return self.ball_prediction
+
+    def set_game_state(self, game_state):
+        pass
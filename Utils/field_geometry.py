@@ -0,0 +1,85 @@
+import numpy as np
+
+from .common_values import (
+    SIDE_WALL_X, BACK_WALL_Y, BACK_NET_Y, CEILING_Z, GOAL_HEIGHT, GOAL_CENTER_TO_POST,
+    BLUE_GOAL_BACK, ORANGE_GOAL_BACK, BLUE_GOAL_CENTER, ORANGE_GOAL_CENTER,
+)
+
+# Goal targets indexed by team number: [0] is the blue goal, [1] the orange goal
+GOAL_BACKS = np.array((BLUE_GOAL_BACK, ORANGE_GOAL_BACK), dtype=np.float64)
+GOAL_CENTERS = np.array((BLUE_GOAL_CENTER, ORANGE_GOAL_CENTER), dtype=np.float64)
+
+
+def target_goals(team_nums, own_goal=False):
+    # Index into GOAL_BACKS / GOAL_CENTERS of the goal every player attacks (or defends with own_goal=True)
+    team_nums = np.asarray(team_nums)
+    return team_nums if own_goal else 1 - team_nums
+
+
+# The helpers below take one position (3,) or many (n, 3) and return a value per position.
+# Walls are treated as flat, the rounded corners and goal openings are ignored.
+
+def distance_to_side_walls(positions):
+    return SIDE_WALL_X - np.abs(positions[..., 0])
+
+
+def distance_to_back_walls(positions):
+    return BACK_WALL_Y - np.abs(positions[..., 1])
+
+
+def distance_to_nearest_wall(positions):
+    return np.minimum(distance_to_side_walls(positions), distance_to_back_walls(positions))
+
+
+def distance_to_floor(positions):
+    return positions[..., 2]
+
+
+def distance_to_ceiling(positions):
+    return CEILING_Z - positions[..., 2]
+
+
+def distances_to_goals(positions, goals=GOAL_BACKS):
+    # (..., 2) distances to the blue and the orange goal
+    return np.linalg.norm(positions[..., None, :] - goals, axis=-1)
+
+
+# Region labels are bit flags, a position can be in several regions at once
+REGION_WALL = 1
+REGION_CORNER = 2
+REGION_GOAL_BOX = 4
+REGION_CEILING = 8
+REGION_FLOOR = 16
+
+
+def region_labels(positions, wall_distance=700.0, corner_distance=1200.0, ceiling_distance=300.0, floor_distance=200.0,
+                  goal_box_half_width=GOAL_CENTER_TO_POST + 400.0, goal_box_depth=1100.0, goal_box_height=GOAL_HEIGHT + 200.0):
+    # Exact region flags of every position, FieldRegionGrid stores these on a coarse grid for constant time lookups
+    side_distance = distance_to_side_walls(positions)
+    back_distance = distance_to_back_walls(positions)
+    labels = np.zeros(np.shape(side_distance), dtype=np.uint8)
+    labels |= np.where(np.minimum(side_distance, back_distance) < wall_distance, REGION_WALL, 0).astype(np.uint8)
+    labels |= np.where((side_distance < corner_distance) & (back_distance < corner_distance), REGION_CORNER, 0).astype(np.uint8)
+    in_goal_box = (np.abs(positions[..., 0]) < goal_box_half_width) & (back_distance < goal_box_depth) & (positions[..., 2] < goal_box_height)
+    labels |= np.where(in_goal_box, REGION_GOAL_BOX, 0).astype(np.uint8)
+    labels |= np.where(distance_to_ceiling(positions) < ceiling_distance, REGION_CEILING, 0).astype(np.uint8)
+    labels |= np.where(distance_to_floor(positions) < floor_distance, REGION_FLOOR, 0).astype(np.uint8)
+    return labels
+
+
+class FieldRegionGrid:
+    # Region flags precomputed at the center of every cell of a coarse 3D grid over the field (goals included).
+    # A lookup is one index computation for all positions, exact only up to cell_size near region borders.
+    def __init__(self, cell_size: float = 100.0, **region_options):
+        self.cell_size = cell_size
+        self.origin = np.array((-SIDE_WALL_X, -BACK_NET_Y, 0.0))
+        extent = np.array((2 * SIDE_WALL_X, 2 * BACK_NET_Y, CEILING_Z))
+        self.shape = np.ceil(extent / cell_size).astype(np.int64)
+        axes = [self.origin[i] + (np.arange(self.shape[i]) + 0.5) * cell_size for i in range(3)]
+        centers = np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1)
+        self.labels = region_labels(centers, **region_options)
+
+    def lookup(self, positions) -> np.ndarray:
+        cells = np.floor((np.asarray(positions) - self.origin) / self.cell_size).astype(np.int64)
+        np.clip(cells, 0, self.shape - 1, out=cells)
+        return self.labels[cells[..., 0], cells[..., 1], cells[..., 2]]
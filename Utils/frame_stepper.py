@@ -0,0 +1,37 @@
+class FrameStepper:
+    # Decides which packets are scored from packet.game_info.frame_num instead of counting packets. A script that
+    # lags behind misses packets, but still steps every tick_skip game frames and knows how many frames a packet covers.
+    def __init__(self, tick_skip: int):
+        self.tick_skip = tick_skip
+        self.last_frame_num = None
+        self.frames = 0  # Active frames since the last step
+        self.skipped_frames = 0  # Frames that never arrived as a packet
+        self.skipped_steps = 0  # Steps that fell entirely inside a gap of skipped frames
+        self.repeated_packets = 0  # Packets of a frame that was already handled
+
+    def advance(self, frame_num: int) -> int:
+        # Returns the number of frames since the previous packet, 0 for a frame that was already handled
+        if self.last_frame_num is None or frame_num < self.last_frame_num:
+            # First packet, or the frame counter started over with a new match
+            frames_elapsed = 1
+        else:
+            frames_elapsed = frame_num - self.last_frame_num
+            if frames_elapsed == 0:
+                self.repeated_packets += 1
+                return 0
+            self.skipped_frames += frames_elapsed - 1
+        self.last_frame_num = frame_num
+        return frames_elapsed
+
+    def is_step(self, frames_elapsed: int, force: bool = False) -> bool:
+        # Counts active frames and tells whether this packet completes a step. The remainder is kept,
+        # so after a gap the next steps stay on the tick_skip grid of the game's frames.
+        # force scores this packet anyway (a goal), the next step then comes tick_skip frames after it.
+        self.frames += frames_elapsed
+        if self.frames < self.tick_skip:
+            if force:
+                self.frames = 0
+            return force
+        self.skipped_steps += self.frames // self.tick_skip - 1
+        self.frames %= self.tick_skip
+        return True
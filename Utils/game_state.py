@@ -3,8 +3,12 @@ from typing import List, Optional
 
 from rlbot.utils.structures.game_data_struct import GameTickPacket, FieldInfoPacket, PlayerInfo
 
-from .physics_object import PhysicsObject
+from .physics_object import PhysicsObject, PhysicsBatch
 from .player_data import PlayerData
+from .input_snapshot import INPUT_CHANNELS
+from .boost_pads import BOOST_PAD_INDEX, boost_pad_states
+from .step_features import StepFeatures
+from .ball_prediction import BallTrajectory
 
 
 class GameState:
@@ -17,53 +21,162 @@ class GameState:
         self.last_touch: Optional[int] = -1
         
         self.players: List[PlayerData] = []
+        self._player_pool: List[PlayerData] = []  # Reused every decode, one PlayerData per car index
+        self._spawn_ids: List[Optional[int]] = []  # spawn_id of the car each pooled PlayerData belongs to
         self._on_ground_ticks = np.zeros(64)
         self._air_time_since_jump = np.zeros(64)
+        self.ticks_elapsed = 0  # Ticks covered by the last decode, including the ones only counted by update_counters
+        self._ticks_since_decode = 0
+        self.seconds_elapsed = 0.0
 
         self.ball: PhysicsObject = PhysicsObject()
-        self.inverted_ball: PhysicsObject = PhysicsObject()
+        self._inverted_ball: PhysicsObject = PhysicsObject()
+        self._inverted_ball_is_current = False
 
-        # List of "booleans" (1 or 0)
-        # self.boost_pads: np.ndarray = np.zeros(game_info.num_boosts, dtype=np.float32)
-        # self.inverted_boost_pads: np.ndarray = np.zeros_like(self.boost_pads, dtype=np.float32)
+        # Callable returning rlbot's BallPrediction, e.g. a script's get_ball_prediction_struct. Without one, or if it
+        # has no slices, ball_prediction falls back to a ballistic stand-in computed from the decoded ball.
+        self.ball_prediction_source = None
+        self._ball_prediction = BallTrajectory()
+        self._ball_prediction_is_current = False
+
+        # Physics of every car index, each player's car_data is a view of its row. Use cars.forwards(), cars.ups(),
+        # cars.rotation_mtxs() or cars.inverted() to get the orientation of all players in one array operation.
+        self.cars: PhysicsBatch = PhysicsBatch()
+
+        # Per-player arrays (one row per entry in self.players) used by batched rewards
+        self.car_positions: np.ndarray = np.zeros((0, 3))
+        self.car_linear_velocities: np.ndarray = np.zeros((0, 3))
+        self.car_angular_velocities: np.ndarray = np.zeros((0, 3))
+        self.team_nums: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.boost_amounts: np.ndarray = np.zeros(0)
+        self.on_ground: np.ndarray = np.zeros(0, dtype=bool)
+        self.ball_touched: np.ndarray = np.zeros(0, dtype=bool)
+        # Controller inputs in INPUT_CHANNELS order, each player's inputs attribute is a view of its row
+        self._inputs = np.zeros((64, len(INPUT_CHANNELS)))
+        self.inputs: np.ndarray = self._inputs[:0]
+
+        # Distances, directions and speeds shared by the rewards, recomputed lazily after every decode
+        self.features: StepFeatures = StepFeatures(self)
+
+        # List of "booleans" (1 or 0) in BOOST_LOCATIONS order, refreshed every tick without reallocating
+        self.boost_pad_index = BOOST_PAD_INDEX  # Pad positions for nearest pad / pads within radius queries
+        self.boost_pads: np.ndarray = np.zeros(len(BOOST_PAD_INDEX.positions), dtype=np.float32)
+        self.inverted_boost_pads: np.ndarray = self.boost_pads[::-1]  # A reversed view, always in sync with boost_pads
+
+    @property
+    def inverted_ball(self) -> PhysicsObject:
+        # Orange-perspective ball, only inverted the first time it is read after a decode
+        if not self._inverted_ball_is_current:
+            self._inverted_ball.invert(self.ball)
+            self._inverted_ball_is_current = True
+        return self._inverted_ball
+
+    @property
+    def ball_prediction(self) -> BallTrajectory:
+        # Fetched or simulated the first time it is read after a decode, then shared by all rewards and players
+        if not self._ball_prediction_is_current:
+            ball_prediction = self.ball_prediction_source() if self.ball_prediction_source is not None else None
+            if ball_prediction is not None and ball_prediction.num_slices > 0:
+                self._ball_prediction.read_struct(ball_prediction, self.seconds_elapsed)
+            else:
+                self._ball_prediction.simulate(self.ball.position, self.ball.linear_velocity)
+            self._ball_prediction_is_current = True
+        return self._ball_prediction
+
+    def update_counters(self, packet: GameTickPacket, ticks_elapsed=1):
+        # Cheap update for ticks that are not decoded, keeps the on ground and air time counters exact
+        for i in range(packet.num_cars):
+            self._update_counters(packet.game_cars[i], i, ticks_elapsed)
+        self._decode_boost_pads(packet)
+        self._ticks_since_decode += ticks_elapsed
 
     def decode(self, packet: GameTickPacket, ticks_elapsed=1):
+        self.ticks_elapsed = self._ticks_since_decode + ticks_elapsed
+        self._ticks_since_decode = 0
+        self.seconds_elapsed = packet.game_info.seconds_elapsed
+
         self.blue_score = packet.teams[0].score
         self.orange_score = packet.teams[1].score
         self.scoreLine = [self.blue_score, self.orange_score]  # Update this line
 
-        # for i in range(packet.num_boost):
-            # self.boost_pads[i] = packet.game_boosts[i].is_active
-        # self.inverted_boost_pads[:] = self.boost_pads[::-1]
+        self._decode_boost_pads(packet)
 
         self.ball.decode_ball_data(packet.game_ball.physics)
-        self.inverted_ball.invert(self.ball)
+        self._inverted_ball_is_current = False
+        self._ball_prediction_is_current = False
+
+        if packet.num_cars != len(self._player_pool):
+            self._resize_player_pool(packet.num_cars)
 
-        self.players = []
         latest_touch = packet.game_ball.latest_touch
-        for i in range(packet.num_cars):
-            player = self._decode_player(packet.game_cars[i], i, ticks_elapsed)
-            if latest_touch.time_seconds > 0 and i == latest_touch.player_index and packet.game_info.seconds_elapsed - latest_touch.time_seconds < self.tick_skip / 120:
+        for i, player in enumerate(self.players):
+            player_info = packet.game_cars[i]
+            if player_info.spawn_id != self._spawn_ids[i]:
+                # A different car in this slot (e.g. a swapped bot) must not inherit the previous car's state
+                player = self._reset_player(i, player_info.spawn_id)
+            self._decode_player(player_info, i, ticks_elapsed, player)
+            if latest_touch.time_seconds > 0 and i == latest_touch.player_index and packet.game_info.seconds_elapsed - latest_touch.time_seconds < self.ticks_elapsed / 120:
                 player.ball_touched = True
-            
-            self.players.append(player)
         
         if latest_touch.time_seconds > 0:
             self.last_touch = latest_touch.player_index
 
-    def _decode_player(self, player_info: PlayerInfo, index: int, ticks_elapsed: int) -> PlayerData:
+        self._stack_players()
+        self.features.invalidate()
+
+    def _decode_boost_pads(self, packet: GameTickPacket):
+        pad_states = boost_pad_states(packet)
+        if len(pad_states) != len(self.boost_pads):
+            self.boost_pads = np.zeros(len(pad_states), dtype=np.float32)
+            self.inverted_boost_pads = self.boost_pads[::-1]
+        np.copyto(self.boost_pads, pad_states['is_active'])
+
+    def _resize_player_pool(self, num_cars: int):
+        # Keeps the PlayerData of car indices that still exist, so delta based fields carry over
+        del self._player_pool[num_cars:]
+        del self._spawn_ids[num_cars:]
+        self.cars.resize(num_cars)
+        while len(self._player_pool) < num_cars:
+            player_data = PlayerData()
+            player_data.car_data = self.cars.objects[len(self._player_pool)]
+            self._player_pool.append(player_data)
+            self._spawn_ids.append(None)
+        self.players = list(self._player_pool)
+
+        if num_cars > len(self._inputs):
+            inputs = np.zeros((num_cars, len(INPUT_CHANNELS)))
+            inputs[:len(self._inputs)] = self._inputs
+            self._inputs = inputs
+        self.inputs = self._inputs[:num_cars]
+        for i, player in enumerate(self.players):
+            player.inputs = self._inputs[i]
+
+    def _reset_player(self, index: int, spawn_id: int) -> PlayerData:
         player_data = PlayerData()
+        player_data.car_data = self._player_pool[index].car_data
+        player_data.inputs = self._player_pool[index].inputs
+        self._player_pool[index] = player_data
+        self.players[index] = player_data
+        self._spawn_ids[index] = spawn_id
+        self._on_ground_ticks[index] = 0
+        self._air_time_since_jump[index] = 0
+        return player_data
+
+    def _stack_players(self):
+        # Copies, so arrays a reward keeps from an earlier step are not overwritten by the next decode
+        self.car_positions = self.cars.positions.copy()
+        self.car_linear_velocities = self.cars.linear_velocities.copy()
+        self.car_angular_velocities = self.cars.angular_velocities.copy()
+        self.team_nums = np.array([player.team_num for player in self.players], dtype=np.int64)
+        self.boost_amounts = np.array([player.boost_amount for player in self.players], dtype=np.float64)
+        self.on_ground = np.array([player.on_ground for player in self.players], dtype=bool)
+        self.ball_touched = np.array([player.ball_touched for player in self.players], dtype=bool)
 
+    def _decode_player(self, player_info: PlayerInfo, index: int, ticks_elapsed: int, player_data: PlayerData) -> PlayerData:
         player_data.car_data.decode_car_data(player_info.physics)
-        player_data.inverted_car_data.invert(player_data.car_data)
+        player_data._inverted_car_data_is_current = False
 
-        if player_info.has_wheel_contact:
-            self._on_ground_ticks[index] = 0
-            self._air_time_since_jump[index] = 0
-        else:
-            self._on_ground_ticks[index] += ticks_elapsed
-            if player_info.jumped:
-                self._air_time_since_jump[index] += ticks_elapsed
+        self._update_counters(player_info, index, ticks_elapsed)
 
         player_data.car_id = index
         player_data.team_num = player_info.team
@@ -72,11 +185,11 @@ class GameState:
         player_data.match_shots = player_info.score_info.shots
         player_data.match_demolishes = player_info.score_info.demolitions
         player_data.match_assists = player_info.score_info.assists
-        if player_data.boost_amount < player_info.boost / 100:
-            if player_data.boost_pickups == -1:
-                player_data.boost_pickups = 1
-            else:
-                player_data.boost_pickups += 1
+        if player_data.boost_pickups == -1:
+            # First decode of this car, there is no previous boost amount to compare against
+            player_data.boost_pickups = 0
+        elif player_data.boost_amount < player_info.boost / 100:
+            player_data.boost_pickups += 1
         player_data.is_demoed = player_info.is_demolished
         player_data.on_ground = player_info.has_wheel_contact or self._on_ground_ticks[index] <= 6
         player_data.ball_touched = False
@@ -86,4 +199,13 @@ class GameState:
         player_data.has_flip = self._air_time_since_jump[index] < 150 and not player_info.double_jumped
         player_data.boost_amount = player_info.boost / 100
 
-        return player_data
\ No newline at end of file
+        return player_data
+
+    def _update_counters(self, player_info: PlayerInfo, index: int, ticks_elapsed: int):
+        if player_info.has_wheel_contact:
+            self._on_ground_ticks[index] = 0
+            self._air_time_since_jump[index] = 0
+        else:
+            self._on_ground_ticks[index] += ticks_elapsed
+            if player_info.jumped:
+                self._air_time_since_jump[index] += ticks_elapsed
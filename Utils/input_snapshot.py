@@ -0,0 +1,31 @@
+import numpy as np
+
+# Order of the controller channels in every inputs array
+INPUT_CHANNELS = ('steer', 'throttle', 'pitch', 'roll', 'jump', 'boost', 'handbrake', 'use_item')
+
+
+class InputSnapshot:
+    # Latest controller state of every car index in one preallocated (max_players, len(INPUT_CHANNELS)) array.
+    # The relay thread replaces a whole row per input change and the main loop copies all the rows it needs
+    # into its own buffer once per step. Both are single small NumPy copies that hold the GIL, so the main loop
+    # never sees half of an input change and no lock is needed.
+    def __init__(self, max_players: int = 64):
+        self.latest = np.zeros((max_players, len(INPUT_CHANNELS)))
+
+    def write(self, player_index: int, steer, throttle, pitch, roll, jump, boost, handbrake, use_item):
+        if player_index >= len(self.latest):
+            # Only the relay thread writes, a reader keeps using the old array until the new one is swapped in
+            latest = np.zeros((max(player_index + 1, 2 * len(self.latest)), len(INPUT_CHANNELS)))
+            latest[:len(self.latest)] = self.latest
+            self.latest = latest
+        self.latest[player_index] = (steer, throttle, pitch, roll, jump, boost, handbrake, use_item)
+
+    def read_into(self, out: np.ndarray):
+        # Copies the inputs of car indices 0 to len(out) - 1 into out
+        latest = self.latest
+        num_players = min(len(out), len(latest))
+        np.copyto(out[:num_players], latest[:num_players])
+        out[num_players:] = 0
+
+    def reset(self):
+        self.latest[:] = 0
@@ -4,37 +4,50 @@ from rlbot.utils.structures.game_data_struct import Physics, Vector3, Rotator
 
 
 class PhysicsObject:
+    __slots__ = ('position', 'quaternion', 'linear_velocity', 'angular_velocity', '_euler_angles', '_rotation_mtx', '_has_computed_rot_mtx',
+                 '_batch', '_batch_index')
+
+    _invert_vec = np.asarray([-1.0, -1.0, 1.0])
+    _invert_pyr = np.asarray([0.0, math.pi, 0.0])
+
     def __init__(self, position=None, euler_angles=None, linear_velocity=None, angular_velocity=None):
-        self.position: np.ndarray = position if position else np.zeros(3)
+        self.position: np.ndarray = np.array(position, dtype=np.float64) if position is not None else np.zeros(3)
 
         # ones by default to prevent mathematical errors when converting quat to rot matrix on empty physics state
         self.quaternion: np.ndarray = np.ones(4)
 
-        self.linear_velocity: np.ndarray = linear_velocity if linear_velocity else np.zeros(3)
-        self.angular_velocity: np.ndarray = angular_velocity if angular_velocity else np.zeros(3)
-        self._euler_angles: np.ndarray = euler_angles if euler_angles else np.zeros(3)
+        self.linear_velocity: np.ndarray = np.array(linear_velocity, dtype=np.float64) if linear_velocity is not None else np.zeros(3)
+        self.angular_velocity: np.ndarray = np.array(angular_velocity, dtype=np.float64) if angular_velocity is not None else np.zeros(3)
+        self._euler_angles: np.ndarray = np.array(euler_angles, dtype=np.float64) if euler_angles is not None else np.zeros(3)
         self._rotation_mtx: np.ndarray = np.zeros((3,3))
         self._has_computed_rot_mtx = False
+        self._batch = None  # Set for views of a PhysicsBatch row, whose batch computes all rotation matrices at once
+        self._batch_index = -1
 
-        self._invert_vec = np.asarray([-1, -1, 1])
-        self._invert_pyr = np.asarray([0, math.pi, 0])
-
+    # Decoding writes into the existing arrays, so keep a .copy() of anything that has to survive the next decode
     def decode_car_data(self, car_data: Physics):
-        self.position = self._vector_to_numpy(car_data.location)
-        self._euler_angles = self._rotator_to_numpy(car_data.rotation)
-        self.linear_velocity = self._vector_to_numpy(car_data.velocity)
-        self.angular_velocity = self._vector_to_numpy(car_data.angular_velocity)
+        self._vector_to_numpy(car_data.location, self.position)
+        self._rotator_to_numpy(car_data.rotation, self._euler_angles)
+        self._vector_to_numpy(car_data.velocity, self.linear_velocity)
+        self._vector_to_numpy(car_data.angular_velocity, self.angular_velocity)
+        self._has_computed_rot_mtx = False
+        if self._batch is not None:
+            self._batch.invalidate()
 
     def decode_ball_data(self, ball_data: Physics):
-        self.position = self._vector_to_numpy(ball_data.location)
-        self.linear_velocity = self._vector_to_numpy(ball_data.velocity)
-        self.angular_velocity = self._vector_to_numpy(ball_data.angular_velocity)
+        self._vector_to_numpy(ball_data.location, self.position)
+        self._vector_to_numpy(ball_data.velocity, self.linear_velocity)
+        self._vector_to_numpy(ball_data.angular_velocity, self.angular_velocity)
+        self._has_computed_rot_mtx = False
 
     def invert(self, other):
-        self.position = other.position * self._invert_vec
-        self._euler_angles = other.euler_angles() + self._invert_pyr
-        self.linear_velocity = other.linear_velocity * self._invert_vec
-        self.angular_velocity = other.angular_velocity * self._invert_vec
+        np.multiply(other.position, self._invert_vec, out=self.position)
+        np.add(other.euler_angles(), self._invert_pyr, out=self._euler_angles)
+        np.multiply(other.linear_velocity, self._invert_vec, out=self.linear_velocity)
+        np.multiply(other.angular_velocity, self._invert_vec, out=self.angular_velocity)
+        self._has_computed_rot_mtx = False
+        if self._batch is not None:
+            self._batch.invalidate()
 
     # pitch, yaw, roll
     def euler_angles(self) -> np.ndarray:
@@ -50,8 +63,12 @@ class PhysicsObject:
         return self._euler_angles[2]
 
     def rotation_mtx(self) -> np.ndarray:
+        if self._batch is not None:
+            self._batch.rotation_mtxs()  # Fills this row along with all the others, a no-op if they are current
+            return self._rotation_mtx
+
         if not self._has_computed_rot_mtx:
-            self._rotation_mtx = self._euler_to_rotation(self._euler_angles)
+            self._euler_to_rotation(self._euler_angles, self._rotation_mtx)
             self._has_computed_rot_mtx = True
 
         return self._rotation_mtx
@@ -68,13 +85,19 @@ class PhysicsObject:
     def up(self) -> np.ndarray:
         return self.rotation_mtx()[:, 2]
 
-    def _vector_to_numpy(self, vector: Vector3):
-        return np.asarray([vector.x, vector.y, vector.z])
+    def _vector_to_numpy(self, vector: Vector3, out: np.ndarray):
+        out[0] = vector.x
+        out[1] = vector.y
+        out[2] = vector.z
+        return out
 
-    def _rotator_to_numpy(self, rotator: Rotator):
-        return np.asarray([rotator.pitch, rotator.yaw, rotator.roll])
+    def _rotator_to_numpy(self, rotator: Rotator, out: np.ndarray):
+        out[0] = rotator.pitch
+        out[1] = rotator.yaw
+        out[2] = rotator.roll
+        return out
 
-    def _euler_to_rotation(self, pyr: np.ndarray):
+    def _euler_to_rotation(self, pyr: np.ndarray, theta: np.ndarray):
         CP = math.cos(pyr[0])
         SP = math.sin(pyr[0])
         CY = math.cos(pyr[1])
@@ -82,8 +105,6 @@ class PhysicsObject:
         CR = math.cos(pyr[2])
         SR = math.sin(pyr[2])
 
-        theta = np.empty((3, 3))
-
         # front direction
         theta[0, 0] = CP * CY
         theta[1, 0] = CP * SY
@@ -99,4 +120,144 @@ class PhysicsObject:
         theta[1, 2] = -CR * SY * SP + SR * CY
         theta[2, 2] = CP * CR
 
-        return theta
\ No newline at end of file
+        return theta
+
+
+_COS, _SIN, _ONE = 0, 1, 2
+
+
+def _rotation_terms():
+    # Every entry of the rotation matrix is a sum of (pitch term) * (yaw term) * (roll term) products, each term being
+    # the cosine, the sine or 1 (see PhysicsObject._euler_to_rotation). Maps the 27 possible products to the 9 entries.
+    terms = np.zeros((3, 3, 3, 3, 3))  # [pitch, yaw, roll, row, column]
+    # front direction
+    terms[_COS, _COS, _ONE, 0, 0] = 1  # CP * CY
+    terms[_COS, _SIN, _ONE, 1, 0] = 1  # CP * SY
+    terms[_SIN, _ONE, _ONE, 2, 0] = 1  # SP
+    # left direction
+    terms[_SIN, _COS, _SIN, 0, 1] = 1  # CY * SP * SR
+    terms[_ONE, _SIN, _COS, 0, 1] = -1  # - CR * SY
+    terms[_SIN, _SIN, _SIN, 1, 1] = 1  # SY * SP * SR
+    terms[_ONE, _COS, _COS, 1, 1] = 1  # CR * CY
+    terms[_COS, _ONE, _SIN, 2, 1] = -1  # -CP * SR
+    # up direction
+    terms[_SIN, _COS, _COS, 0, 2] = -1  # -CR * CY * SP
+    terms[_ONE, _SIN, _SIN, 0, 2] = -1  # - SR * SY
+    terms[_SIN, _SIN, _COS, 1, 2] = -1  # -CR * SY * SP
+    terms[_ONE, _COS, _SIN, 1, 2] = 1  # SR * CY
+    terms[_COS, _ONE, _COS, 2, 2] = 1  # CP * CR
+    return terms.reshape(27, 9)
+
+
+_ROTATION_TERMS = _rotation_terms()
+
+
+class PhysicsBatch:
+    # Physics of many cars in contiguous (size, 3) and (size, 3, 3) arrays. objects holds a PhysicsObject view of
+    # every row, so decoding a view writes straight into the batch and existing per-car code keeps working.
+    # Rotation matrices and inverted copies are computed for all rows in one vectorized call the first time
+    # they are needed after a change.
+    def __init__(self, size: int = 0, capacity: int = 64):
+        capacity = max(size, capacity)
+        self._positions = np.zeros((capacity, 3))
+        self._euler_angles = np.zeros((capacity, 3))
+        self._linear_velocities = np.zeros((capacity, 3))
+        self._angular_velocities = np.zeros((capacity, 3))
+        self._rotation_mtxs = np.zeros((capacity, 3, 3))
+        self.objects = []
+        self._bind_objects()
+        self.size = size
+        self._inverted = None
+        self.invalidate()
+
+    def _bind_objects(self):
+        # Points existing views at the current arrays (so they stay the same objects across a resize) and adds new ones
+        while len(self.objects) < len(self._positions):
+            self.objects.append(PhysicsObject())
+        for i, physics_object in enumerate(self.objects):
+            physics_object.position = self._positions[i]
+            physics_object._euler_angles = self._euler_angles[i]
+            physics_object.linear_velocity = self._linear_velocities[i]
+            physics_object.angular_velocity = self._angular_velocities[i]
+            physics_object._rotation_mtx = self._rotation_mtxs[i]
+            physics_object._batch = self
+            physics_object._batch_index = i
+
+    def resize(self, size: int):
+        # Rows below the old size keep their values
+        if size > len(self._positions):
+            capacity = max(size, 2 * len(self._positions))
+            for name in ('_positions', '_euler_angles', '_linear_velocities', '_angular_velocities', '_rotation_mtxs'):
+                old = getattr(self, name)
+                new = np.zeros((capacity,) + old.shape[1:])
+                new[:len(old)] = old
+                setattr(self, name, new)
+            self._bind_objects()
+        self.size = size
+        self.invalidate()
+
+    def invalidate(self):
+        self._has_computed_rot_mtxs = False
+        self._inverted_is_current = False
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions[:self.size]
+
+    @property
+    def euler_angles(self) -> np.ndarray:
+        return self._euler_angles[:self.size]
+
+    @property
+    def linear_velocities(self) -> np.ndarray:
+        return self._linear_velocities[:self.size]
+
+    @property
+    def angular_velocities(self) -> np.ndarray:
+        return self._angular_velocities[:self.size]
+
+    def rotation_mtxs(self) -> np.ndarray:
+        if not self._has_computed_rot_mtxs:
+            self._euler_to_rotations(self.euler_angles, self._rotation_mtxs[:self.size])
+            self._has_computed_rot_mtxs = True
+        return self._rotation_mtxs[:self.size]
+
+    def forwards(self) -> np.ndarray:
+        return self.rotation_mtxs()[:, :, 0]
+
+    def rights(self) -> np.ndarray:
+        return self.rotation_mtxs()[:, :, 1] * -1  # Inverted compared to rlgym, same as PhysicsObject.right
+
+    def lefts(self) -> np.ndarray:
+        return self.rotation_mtxs()[:, :, 1]
+
+    def ups(self) -> np.ndarray:
+        return self.rotation_mtxs()[:, :, 2]
+
+    def inverted(self) -> 'PhysicsBatch':
+        # Orange-perspective copy of every row, recomputed at most once per change
+        if self._inverted is None:
+            self._inverted = PhysicsBatch(self.size, len(self._positions))
+        inverted = self._inverted
+        if not self._inverted_is_current:
+            if inverted.size != self.size:
+                inverted.resize(self.size)
+            np.multiply(self.positions, PhysicsObject._invert_vec, out=inverted.positions)
+            np.add(self.euler_angles, PhysicsObject._invert_pyr, out=inverted.euler_angles)
+            np.multiply(self.linear_velocities, PhysicsObject._invert_vec, out=inverted.linear_velocities)
+            np.multiply(self.angular_velocities, PhysicsObject._invert_vec, out=inverted.angular_velocities)
+            inverted.invalidate()
+            self._inverted_is_current = True
+        return inverted
+
+    @staticmethod
+    def _euler_to_rotations(pyr: np.ndarray, theta: np.ndarray):
+        # PhysicsObject._euler_to_rotation for every row at once: the products of all (pitch, yaw, roll) terms,
+        # then one matrix product with _ROTATION_TERMS sums them into the nine entries
+        num_rows = len(pyr)
+        terms = np.ones((num_rows, 3, 3))  # [row, cos / sin / 1, pitch / yaw / roll]
+        np.cos(pyr, out=terms[:, _COS])
+        np.sin(pyr, out=terms[:, _SIN])
+        products = terms[:, :, 0, None, None] * terms[:, None, :, 1, None] * terms[:, None, None, :, 2]
+        np.dot(products.reshape(num_rows, 27), _ROTATION_TERMS, out=theta.reshape(num_rows, 9))
+        return theta
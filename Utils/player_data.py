@@ -1,7 +1,16 @@
+import numpy as np
+
 from .physics_object import PhysicsObject
-from collections import defaultdict
+from .input_snapshot import INPUT_CHANNELS
 
 class PlayerData(object):
+    __slots__ = (
+        'car_id', 'team_num', 'match_goals', 'match_saves', 'match_shots', 'match_demolishes', 'match_assists',
+        'boost_pickups', 'is_demoed', 'on_ground', 'ball_touched', 'has_jump', 'has_jumped', 'has_flip',
+        'has_flipped', 'boost_amount', 'car_data', '_inverted_car_data', '_inverted_car_data_is_current',
+        'inputs',
+    )
+
     def __init__(self):
         self.car_id: int = -1
         self.team_num: int = -1
@@ -20,93 +29,96 @@ class PlayerData(object):
         self.has_flipped: bool = False
         self.boost_amount: float = -1
         self.car_data: PhysicsObject = PhysicsObject()
-        self.inverted_car_data: PhysicsObject = PhysicsObject()
-        self._steer_input: float = 0.0
-        self._throttle_input: float = 0.0
-        self._pitch_input: float = 0.0
-        self._roll_input: float = 0.0
-        self._jump_input: bool = False
-        self._boost_input: bool = False
-        self._handbrake_input: bool = False
-        self._use_item_input: bool = False
+        self._inverted_car_data: PhysicsObject = PhysicsObject()
+        self._inverted_car_data_is_current: bool = False
+        # Controller inputs in INPUT_CHANNELS order, GameState points this at the player's row of GameState.inputs
+        self.inputs: np.ndarray = np.zeros(len(INPUT_CHANNELS))
+
+    @property
+    def inverted_car_data(self) -> PhysicsObject:
+        # Orange-perspective car data, only inverted the first time it is read after a decode
+        if not self._inverted_car_data_is_current:
+            batch = self.car_data._batch
+            if batch is not None:
+                # Inverts every car of the batch at once, the other players then only look up their row
+                self._inverted_car_data = batch.inverted().objects[self.car_data._batch_index]
+            else:
+                self._inverted_car_data.invert(self.car_data)
+            self._inverted_car_data_is_current = True
+        return self._inverted_car_data
+
+    @inverted_car_data.setter
+    def inverted_car_data(self, value):
+        self._inverted_car_data = value
+        self._inverted_car_data_is_current = True
 
     @property
-    def steer_input(self):
-        return self._steer_input
+    def steer_input(self) -> float:
+        return float(self.inputs[0])
 
     @steer_input.setter
     def steer_input(self, value):
-        self._steer_input = value
+        self.inputs[0] = value
 
     @property
-    def throttle_input(self):
-        return self._throttle_input
+    def throttle_input(self) -> float:
+        return float(self.inputs[1])
 
     @throttle_input.setter
     def throttle_input(self, value):
-        self._throttle_input = value
+        self.inputs[1] = value
 
     @property
-    def pitch_input(self):
-        return self._pitch_input
+    def pitch_input(self) -> float:
+        return float(self.inputs[2])
 
     @pitch_input.setter
     def pitch_input(self, value):
-        self._pitch_input = value
+        self.inputs[2] = value
 
     @property
-    def roll_input(self):
-        return self._roll_input
+    def roll_input(self) -> float:
+        return float(self.inputs[3])
 
     @roll_input.setter
     def roll_input(self, value):
-        self._roll_input = value
+        self.inputs[3] = value
 
     @property
-    def jump_input(self):
-        return self._jump_input
+    def jump_input(self) -> bool:
+        return bool(self.inputs[4])
 
     @jump_input.setter
     def jump_input(self, value):
-        self._jump_input = value
+        self.inputs[4] = value
 
     @property
-    def boost_input(self):
-        return self._boost_input
+    def boost_input(self) -> bool:
+        return bool(self.inputs[5])
 
     @boost_input.setter
     def boost_input(self, value):
-        self._boost_input = value
+        self.inputs[5] = value
 
     @property
-    def handbrake_input(self):
-        return self._handbrake_input
+    def handbrake_input(self) -> bool:
+        return bool(self.inputs[6])
 
     @handbrake_input.setter
     def handbrake_input(self, value):
-        self._handbrake_input = value
+        self.inputs[6] = value
 
     @property
-    def use_item_input(self):
-        return self._use_item_input
+    def use_item_input(self) -> bool:
+        return bool(self.inputs[7])
 
     @use_item_input.setter
     def use_item_input(self, value):
-        self._use_item_input = value
+        self.inputs[7] = value
 
     def __getitem__(self, index):
         return self
 
     def __setitem__(self, index, value):
         self.car_id = index
-        self._steer_input = value.steer_input
-        self._throttle_input = value.throttle_input
-        self._pitch_input = value.pitch_input
-        self._roll_input = value.roll_input
-        self._jump_input = value.jump_input
-        self._boost_input = value.boost_input
-        self._handbrake_input = value.handbrake_input
-        self._use_item_input = value.use_item_input
-
-# Create a global PlayerData instance
-global_player_data = defaultdict(PlayerData)
+        self.inputs[:] = value.inputs
@@ -0,0 +1,105 @@
+import json
+import numpy as np
+
+# Histogram bucket edges in seconds: 0, then 1 us to 1 s in half decades, then anything slower
+HISTOGRAM_EDGES = np.concatenate(([0.0], np.logspace(-6, 0, 13), [np.inf]))
+
+
+class RollingTimings:
+    # The last `window` durations of one stage in a ring buffer, plus all-time count, total and max
+    def __init__(self, window: int = 1024):
+        self.samples = np.zeros(window)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def recent(self) -> np.ndarray:
+        return self.samples[:min(self.count, len(self.samples))]
+
+    def recent_mean(self) -> float:
+        recent = self.recent()
+        return float(recent.mean()) if len(recent) else 0.0
+
+    def summary(self) -> dict:
+        recent = self.recent()
+        if len(recent):
+            p50, p95, p99 = np.percentile(recent, (50, 95, 99))
+        else:
+            p50 = p95 = p99 = 0.0
+        return {
+            'count': self.count,
+            'total': self.total,
+            'max': self.max,
+            'recent_mean': self.recent_mean(),
+            'recent_p50': float(p50),
+            'recent_p95': float(p95),
+            'recent_p99': float(p99),
+            'recent_histogram': np.histogram(recent, HISTOGRAM_EDGES)[0].tolist(),
+        }
+
+
+class Profiler:
+    # Timings of the stages of RewardTester's tick loop and of every reward, measured with time.perf_counter.
+    # A step is everything done for one scored tick, it overruns when it takes longer than tick_skip / 120 seconds.
+    STAGES = ('packet_wait', 'decode', 'rewards', 'aggregation', 'print', 'render', 'step')
+
+    def __init__(self, budget: float, window: int = 1024):
+        self.budget = budget
+        self.window = window
+        self.stages = {stage: RollingTimings(window) for stage in self.STAGES}
+        self.overruns = 0
+        self.last_overrun_step = None
+        self.set_rewards([])
+
+    def set_rewards(self, reward_names):
+        # Called whenever the reward plan is rebuilt, reward timings are kept per column
+        self.reward_names = list(reward_names)
+        self.reward_timings = [RollingTimings(self.window) for _ in self.reward_names]
+        self.reward_durations = np.zeros(len(self.reward_names))  # Filled by RewardPlan.get_reward_matrix
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage].add(seconds)
+
+    def end_step(self, step: int, seconds: float) -> bool:
+        # Records the rewards timed during this step and returns whether the step went over budget
+        for timings, duration in zip(self.reward_timings, self.reward_durations.tolist()):
+            # Skipped rewards were never timed
+            if duration:
+                timings.add(duration)
+        self.reward_durations[:] = 0
+        self.stages['step'].add(seconds)
+        if seconds > self.budget:
+            self.overruns += 1
+            self.last_overrun_step = step
+            return True
+        return False
+
+    def slowest_rewards(self, n: int):
+        # (name, recent mean, max) of the n rewards with the highest recent mean
+        ranked = sorted(zip(self.reward_names, self.reward_timings), key=lambda item: item[1].recent_mean(), reverse=True)
+        return [(name, timings.recent_mean(), timings.max) for name, timings in ranked[:n] if timings.count]
+
+    def format_lines(self, n: int = 5):
+        steps = self.stages['step'].count
+        lines = [f"{self.overruns}/{steps} steps over the {self.budget * 1000:.1f} ms budget, step mean {self.stages['step'].recent_mean() * 1000:.3f} ms\n"]
+        for name, mean, maximum in self.slowest_rewards(n):
+            lines.append(f"{name}: mean {mean * 1e6:.1f} us, max {maximum * 1e6:.1f} us\n")
+        return lines
+
+    def export(self, path: str):
+        with open(path, 'w') as file:
+            json.dump({
+                'budget': self.budget,
+                'overruns': self.overruns,
+                'last_overrun_step': self.last_overrun_step,
+                'histogram_edges': HISTOGRAM_EDGES.tolist()[:-1] + ['inf'],
+                'stages': {stage: timings.summary() for stage, timings in self.stages.items()},
+                'rewards': [dict(name=name, **timings.summary()) for name, timings in zip(self.reward_names, self.reward_timings)],
+            }, file, indent=2)
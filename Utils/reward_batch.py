@@ -0,0 +1,94 @@
+import time
+import numpy as np
+
+
+def get_rewards(reward_function, game_state) -> np.ndarray:
+    # Rewards that implement get_rewards are evaluated for all players at once,
+    # plain scalar rewards are adapted by looping over the players
+    if hasattr(reward_function, 'get_rewards'):
+        return np.asarray(reward_function.get_rewards(game_state), dtype=np.float64)
+
+    return np.fromiter(
+        (reward_function.get_reward(player_data, game_state, None) for player_data in game_state.players),
+        dtype=np.float64,
+        count=len(game_state.players),
+    )
+
+
+def get_reward_matrix(reward_functions, game_state) -> np.ndarray:
+    # One row per player, one column per reward function (in iteration order)
+    rewards = np.zeros((len(game_state.players), len(reward_functions)))
+    for column, reward_function in enumerate(reward_functions):
+        rewards[:, column] = get_rewards(reward_function, game_state)
+    return rewards
+
+
+class RewardPlan:
+    # Decides once per set of weights which rewards have to run. Zero weight rewards are skipped,
+    # unless they define update_state(game_state), which then keeps their state current instead.
+    # Rewards may also define reset(initial_state), called by reset() at the start of every round, and
+    # pre_step(game_state), called once per step for every reward that runs, before any of them is evaluated.
+    # weight_configurations optionally adds more weightings to compare, name -> one weight per reward in
+    # the order of reward_functions. They become the extra columns of weight_matrix, column 0 being reward_functions' own.
+    # evaluate_all runs zero weight rewards too, for offline comparisons of every component.
+    def __init__(self, reward_functions, weight_configurations=None, evaluate_all=False):
+        weight_configurations = weight_configurations or {}
+        self.reward_functions = list(reward_functions)
+        self.weights = np.fromiter(reward_functions.values(), dtype=np.float64, count=len(reward_functions))
+        self.configuration_names = ['default'] + list(weight_configurations)
+        for name, weights in weight_configurations.items():
+            if len(weights) != len(self.weights):
+                raise ValueError(f"Weight configuration {name!r} has {len(weights)} weights for {len(self.weights)} rewards")
+        self.weight_matrix = np.column_stack([self.weights] + [np.asarray(weights, dtype=np.float64) for weights in weight_configurations.values()])
+        self._key = (tuple(reward_functions.items()), tuple((name, tuple(weights)) for name, weights in weight_configurations.items()))
+        # A reward has to run if any configuration weights it
+        self.active_mask = (self.weight_matrix != 0).any(axis=1) | evaluate_all
+        self.active = np.flatnonzero(self.active_mask).tolist()
+        self.reward_names = [type(reward_function).__name__ for reward_function in self.reward_functions]
+        self.state_only = [
+            i for i, active in enumerate(self.active_mask)
+            if not active and hasattr(self.reward_functions[i], 'update_state')
+        ]
+        self.pre_step = [i for i in self.active + self.state_only if hasattr(self.reward_functions[i], 'pre_step')]
+
+    def reset(self, initial_state):
+        # Every reward with state resets, whether it runs or not, so none of it carries over into the new round
+        for reward_function in self.reward_functions:
+            if hasattr(reward_function, 'reset'):
+                reward_function.reset(initial_state)
+
+    def is_current(self, reward_functions, weight_configurations=None) -> bool:
+        # Any added, removed or reweighted reward or configuration needs a new plan
+        planned_rewards, planned_configurations = self._key
+        return len(reward_functions) == len(planned_rewards) and all(
+            reward_function is planned_function and weight == planned_weight
+            for (reward_function, weight), (planned_function, planned_weight) in zip(reward_functions.items(), planned_rewards)
+        ) and tuple((name, tuple(weights)) for name, weights in (weight_configurations or {}).items()) == planned_configurations
+
+    def get_reward_matrix(self, game_state, durations: np.ndarray = None) -> np.ndarray:
+        # Same layout as get_reward_matrix, skipped rewards are left at 0.
+        # If durations is given, the seconds every evaluated or updated reward took are written to it per column.
+        rewards = np.zeros((len(game_state.players), len(self.reward_functions)))
+        if durations is None:
+            for column in self.pre_step:
+                self.reward_functions[column].pre_step(game_state)
+            for column in self.active:
+                rewards[:, column] = get_rewards(self.reward_functions[column], game_state)
+            for column in self.state_only:
+                self.reward_functions[column].update_state(game_state)
+            return rewards
+
+        durations[:] = 0
+        for column in self.pre_step:
+            start = time.perf_counter()
+            self.reward_functions[column].pre_step(game_state)
+            durations[column] = time.perf_counter() - start
+        for column in self.active:
+            start = time.perf_counter()
+            rewards[:, column] = get_rewards(self.reward_functions[column], game_state)
+            durations[column] += time.perf_counter() - start
+        for column in self.state_only:
+            start = time.perf_counter()
+            self.reward_functions[column].update_state(game_state)
+            durations[column] += time.perf_counter() - start
+        return rewards
@@ -0,0 +1,58 @@
+import os
+import json
+
+
+class FileWatcher:
+    # Polls the modification times of a few files, changed() returns True once after any of them changed
+    def __init__(self, paths):
+        self.paths = [path for path in paths if path is not None]
+        self.modified_times = {path: self._modified_time(path) for path in self.paths}
+
+    @staticmethod
+    def _modified_time(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def changed(self) -> bool:
+        changed = False
+        for path in self.paths:
+            modified_time = self._modified_time(path)
+            if modified_time != self.modified_times[path]:
+                self.modified_times[path] = modified_time
+                changed = True
+        return changed
+
+
+def load_weights(path: str) -> dict:
+    # A weights file maps reward class names to weights, e.g. {"TouchBallReward": 1.0, "VelocityReward": 0.1}.
+    # A class that is used more than once takes a list with one weight per use, in order.
+    with open(path) as file:
+        weights = json.load(file)
+    if not isinstance(weights, dict):
+        raise ValueError(f"{path} should contain a JSON object of reward names to weights")
+    return weights
+
+
+def apply_weights(reward_functions: dict, weights: dict) -> dict:
+    # Returns a new reward -> weight dictionary, rewards the weights do not mention keep their weight
+    uses = {}
+    weighted = {}
+    for reward_function, weight in reward_functions.items():
+        name = type(reward_function).__name__
+        use = uses.get(name, 0)
+        uses[name] = use + 1
+        if name in weights:
+            new_weight = weights[name]
+            if isinstance(new_weight, list):
+                if use >= len(new_weight):
+                    raise ValueError(f"Weights for {name} list {len(new_weight)} weights, but it is used more often")
+                new_weight = new_weight[use]
+            weight = float(new_weight)
+        weighted[reward_function] = weight
+
+    unknown = sorted(set(weights) - set(uses))
+    if unknown:
+        raise ValueError(f"Weights given for rewards that are not in create_reward_functions: {', '.join(unknown)}")
+    return weighted
@@ -0,0 +1,144 @@
+import numpy as np
+
+
+class RewardStats:
+    # Running statistics of every reward component for every player, stored as (players, rewards) arrays.
+    # Mean and variance use Welford's algorithm, percentiles come from a fixed-size reservoir sample per cell,
+    # so memory stays constant no matter how long the session runs.
+    def __init__(self, num_rewards: int, num_players: int = 8, sketch_size: int = 256, seed: int = 0):
+        self.num_rewards = num_rewards
+        self.sketch_size = sketch_size
+        self.rng = np.random.default_rng(seed)
+        self._allocate(num_players)
+
+    def _allocate(self, num_players: int):
+        shape = (num_players, self.num_rewards)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+        self.sketch = np.zeros(shape + (self.sketch_size,))
+
+    def _ensure_players(self, num_players: int):
+        if num_players <= self.count.shape[0]:
+            return
+        old = (self.count, self.mean, self.m2, self.min, self.max, self.sketch)
+        self._allocate(max(num_players, 2 * self.count.shape[0]))
+        for new_array, old_array in zip((self.count, self.mean, self.m2, self.min, self.max, self.sketch), old):
+            new_array[:len(old_array)] = old_array
+
+    def remapped(self, reward_names, new_reward_names) -> 'RewardStats':
+        # Statistics for a new list of rewards that keep the columns of rewards whose name did not change.
+        # The n-th reward of a class takes over the statistics of the n-th reward of that class.
+        stats = RewardStats(len(new_reward_names), self.count.shape[0], self.sketch_size)
+        stats.rng = self.rng
+        old_columns = dict(zip(_name_uses(reward_names), range(len(reward_names))))
+        for new_column, name_use in enumerate(_name_uses(new_reward_names)):
+            if name_use not in old_columns:
+                continue
+            old_column = old_columns[name_use]
+            for new_array, old_array in zip((stats.count, stats.mean, stats.m2, stats.min, stats.max, stats.sketch),
+                                            (self.count, self.mean, self.m2, self.min, self.max, self.sketch)):
+                new_array[:, new_column] = old_array[:, old_column]
+        return stats
+
+    def reset(self):
+        self.count[:] = 0
+        self.mean[:] = 0
+        self.m2[:] = 0
+        self.min[:] = np.inf
+        self.max[:] = -np.inf
+
+    def update(self, values: np.ndarray, active: np.ndarray = None):
+        # values is (num_players, num_rewards) with row i belonging to car index i,
+        # active optionally limits the update to some reward columns (e.g. the ones that were evaluated)
+        num_players = values.shape[0]
+        self._ensure_players(num_players)
+        mask = np.ones(values.shape, dtype=bool) if active is None else np.broadcast_to(active, values.shape)
+
+        count = self.count[:num_players] + mask
+        mean = self.mean[:num_players]
+        delta = values - mean
+        new_mean = mean + np.where(mask, delta / np.maximum(count, 1), 0)
+        self.m2[:num_players] += np.where(mask, delta * (values - new_mean), 0)
+        self.mean[:num_players] = new_mean
+        self.count[:num_players] = count
+        self.min[:num_players] = np.where(mask, np.minimum(self.min[:num_players], values), self.min[:num_players])
+        self.max[:num_players] = np.where(mask, np.maximum(self.max[:num_players], values), self.max[:num_players])
+
+        # Reservoir sampling: fill the sketch first, then replace a random slot with probability sketch_size / count
+        slots = np.where(count <= self.sketch_size, count - 1, self.rng.integers(0, np.maximum(count, 1)))
+        rows, columns = np.nonzero(mask & (slots < self.sketch_size))
+        self.sketch[rows, columns, slots[rows, columns]] = values[rows, columns]
+
+    def variance(self) -> np.ndarray:
+        return np.where(self.count > 1, self.m2 / np.maximum(self.count - 1, 1), 0.0)
+
+    def percentiles(self, player: int, column: int, q=(5, 50, 95)) -> np.ndarray:
+        num_samples = min(self.count[player, column], self.sketch_size)
+        if num_samples == 0:
+            return np.full(len(q), np.nan)
+        return np.percentile(self.sketch[player, column, :num_samples], q)
+
+    def format_lines(self, reward_names, players=None):
+        lines = []
+        std = np.sqrt(self.variance())
+        for player in range(self.count.shape[0]) if players is None else players:
+            if player >= self.count.shape[0]:
+                continue
+            for column, name in enumerate(reward_names):
+                if self.count[player, column] == 0:
+                    continue
+                p5, p50, p95 = self.percentiles(player, column)
+                lines.append(
+                    f"Player {player} {name}: mean {self.mean[player, column]:.6f} std {std[player, column]:.6f} "
+                    f"min {self.min[player, column]:.6f} max {self.max[player, column]:.6f} "
+                    f"p5 {p5:.6f} p50 {p50:.6f} p95 {p95:.6f} (n={self.count[player, column]})"
+                )
+        return lines
+
+    def summary(self) -> dict:
+        # Statistics per reward over all players, as plain arrays so they can be sent between processes and merged
+        summary = {
+            'count': np.zeros(self.num_rewards, dtype=np.int64),
+            'mean': np.zeros(self.num_rewards),
+            'm2': np.zeros(self.num_rewards),
+            'min': np.full(self.num_rewards, np.inf),
+            'max': np.full(self.num_rewards, -np.inf),
+        }
+        for player in range(self.count.shape[0]):
+            summary = merge_summaries(summary, {
+                'count': self.count[player], 'mean': self.mean[player], 'm2': self.m2[player],
+                'min': self.min[player], 'max': self.max[player],
+            })
+        return summary
+
+
+def _name_uses(reward_names):
+    # (name, how many times the name came before) for every reward
+    uses = {}
+    name_uses = []
+    for name in reward_names:
+        name_uses.append((name, uses.get(name, 0)))
+        uses[name] = uses.get(name, 0) + 1
+    return name_uses
+
+
+def merge_summaries(first: dict, second: dict) -> dict:
+    # Combines two RewardStats.summary() results as if all their values had been seen by one RewardStats
+    # (parallel variant of Welford's algorithm by Chan et al.)
+    count = first['count'] + second['count']
+    delta = second['mean'] - first['mean']
+    weight = second['count'] / np.maximum(count, 1)
+    return {
+        'count': count,
+        'mean': first['mean'] + delta * weight,
+        'm2': first['m2'] + second['m2'] + delta ** 2 * first['count'] * weight,
+        'min': np.minimum(first['min'], second['min']),
+        'max': np.maximum(first['max'], second['max']),
+    }
+
+
+def summary_std(summary: dict) -> np.ndarray:
+    return np.sqrt(np.where(summary['count'] > 1, summary['m2'] / np.maximum(summary['count'] - 1, 1), 0.0))
@@ -0,0 +1,45 @@
+from rlbot.utils.structures.game_data_struct import GameTickPacket
+
+# Events returned by RoundTracker.update, in order of precedence when a packet starts more than one
+NEW_MATCH = 'new_match'
+GOAL = 'goal'
+CARS_CHANGED = 'cars_changed'
+KICKOFF = 'kickoff'
+ROUND_EVENTS = (NEW_MATCH, GOAL, CARS_CHANGED, KICKOFF)
+
+
+class RoundTracker:
+    # Looks at every packet for the transitions after which per-car reward state is stale: a new match (or the first
+    # packet), a goal, cars joining, leaving or being swapped (a different spawn_id in a slot) and the start of a kickoff
+    def __init__(self):
+        self.score = None
+        self.spawn_ids = []
+        self.is_round_active = False
+        self.is_kickoff_pause = False
+        self.counts = dict.fromkeys(ROUND_EVENTS, 0)
+
+    def update(self, packet: GameTickPacket):
+        # Returns the event this packet starts, or None
+        game_info = packet.game_info
+        score = (packet.teams[0].score, packet.teams[1].score)
+        spawn_ids = [packet.game_cars[i].spawn_id for i in range(packet.num_cars)]
+        kickoff_started = (game_info.is_kickoff_pause and not self.is_kickoff_pause) or (game_info.is_round_active and not self.is_round_active)
+
+        if self.score is None or score[0] < self.score[0] or score[1] < self.score[1]:
+            event = NEW_MATCH
+        elif score != self.score:
+            event = GOAL
+        elif spawn_ids != self.spawn_ids:
+            event = CARS_CHANGED
+        elif kickoff_started:
+            event = KICKOFF
+        else:
+            event = None
+
+        self.score = score
+        self.spawn_ids = spawn_ids
+        self.is_round_active = game_info.is_round_active
+        self.is_kickoff_pause = game_info.is_kickoff_pause
+        if event is not None:
+            self.counts[event] += 1
+        return event
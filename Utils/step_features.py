@@ -0,0 +1,63 @@
+import numpy as np
+
+
+class StepFeatures:
+    # Geometry shared by the rewards, computed for all players the first time it is read after a decode.
+    # Arrays have one row per entry in game_state.players, so index them with player_data.car_id.
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.invalidate()
+
+    def invalidate(self):
+        self._car_to_ball = None
+        self._distance_to_ball = None
+        self._dir_to_ball = None
+        self._car_speeds = None
+        self._ball_speed = None
+        self._pad_distances = None
+        self._ball_intercepts = None
+
+    @property
+    def car_to_ball(self) -> np.ndarray:
+        # ball.position - car.position
+        if self._car_to_ball is None:
+            self._car_to_ball = self.game_state.ball.position - self.game_state.car_positions
+        return self._car_to_ball
+
+    @property
+    def distance_to_ball(self) -> np.ndarray:
+        if self._distance_to_ball is None:
+            self._distance_to_ball = np.linalg.norm(self.car_to_ball, axis=1)
+        return self._distance_to_ball
+
+    @property
+    def dir_to_ball(self) -> np.ndarray:
+        if self._dir_to_ball is None:
+            self._dir_to_ball = self.car_to_ball / self.distance_to_ball[:, None]
+        return self._dir_to_ball
+
+    @property
+    def car_speeds(self) -> np.ndarray:
+        if self._car_speeds is None:
+            self._car_speeds = np.linalg.norm(self.game_state.car_linear_velocities, axis=1)
+        return self._car_speeds
+
+    @property
+    def ball_speed(self) -> float:
+        if self._ball_speed is None:
+            self._ball_speed = np.linalg.norm(self.game_state.ball.linear_velocity)
+        return self._ball_speed
+
+    @property
+    def pad_distances(self) -> np.ndarray:
+        # (players, pads) distances, see GameState.boost_pad_index for nearest pad and radius queries
+        if self._pad_distances is None:
+            self._pad_distances = self.game_state.boost_pad_index.distances(self.game_state.car_positions)
+        return self._pad_distances
+
+    @property
+    def ball_intercepts(self):
+        # (indices, distances) of the first slice of game_state.ball_prediction every player can reach at max speed
+        if self._ball_intercepts is None:
+            self._ball_intercepts = self.game_state.ball_prediction.intercepts(self.game_state.car_positions)
+        return self._ball_intercepts
@@ -0,0 +1,146 @@
+import os
+import glob
+import queue
+import threading
+import numpy as np
+
+
+class TelemetryExporter:
+    # Buffers one row per player per scored step in a ring of preallocated chunks and writes full chunks
+    # as .npz shards on a background thread. If every chunk is still waiting to be written, rows are
+    # dropped (and counted) instead of blocking the caller.
+    def __init__(self, directory: str, chunk_rows: int = 8192, num_chunks: int = 4):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.num_chunks = num_chunks
+        self.reward_names = None
+        self.configuration_names = None
+        self.chunks = []
+        self.free_chunks = queue.Queue()
+        self.full_chunks = queue.Queue()
+        self.current = None
+        self.rows = 0
+        self.dropped_rows = 0
+        self.shard_index = len(glob.glob(os.path.join(directory, "shard_*.npz")))
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _allocate_chunks(self, num_rewards: int, num_configurations: int):
+        # Chunk buffers depend on the number of rewards, so they are (re)built per reward set
+        self.chunks = [{
+            'step': np.zeros(self.chunk_rows, dtype=np.int64),
+            'frame_num': np.zeros(self.chunk_rows, dtype=np.int64),
+            'seconds_elapsed': np.zeros(self.chunk_rows, dtype=np.float64),
+            'car_id': np.zeros(self.chunk_rows, dtype=np.int16),
+            'team': np.zeros(self.chunk_rows, dtype=np.int8),
+            'raw': np.zeros((self.chunk_rows, num_rewards), dtype=np.float64),
+            'weighted': np.zeros((self.chunk_rows, num_rewards), dtype=np.float64),
+            'configuration_rewards': np.zeros((self.chunk_rows, num_configurations), dtype=np.float64),
+        } for _ in range(self.num_chunks)]
+        self.free_chunks = queue.Queue()
+        for chunk in self.chunks:
+            self.free_chunks.put(chunk)
+        self.current = self.free_chunks.get_nowait()
+        self.rows = 0
+
+    def write_step(self, step, frame_num, seconds_elapsed, teams, raw_rewards, weights, reward_names,
+                   configuration_rewards, configuration_names, active_mask=None):
+        # raw_rewards is (num_players, num_rewards) and configuration_rewards (num_players, num_configurations),
+        # row i belonging to car index i. weighted uses weights, the default configuration. Rewards outside
+        # active_mask were not evaluated and are written as NaN, so they can't be mistaken for a reward of 0.
+        if list(reward_names) != self.reward_names or list(configuration_names) != self.configuration_names:
+            self._submit()
+            self.reward_names = list(reward_names)
+            self.configuration_names = list(configuration_names)
+            self._allocate_chunks(len(reward_names), len(configuration_names))
+
+        num_players = raw_rewards.shape[0]
+        if self.current is None:
+            try:
+                self.current = self.free_chunks.get_nowait()
+            except queue.Empty:
+                self.dropped_rows += num_players
+                return
+        if self.rows + num_players > self.chunk_rows:
+            self._submit()
+            if self.current is None:
+                self.dropped_rows += num_players
+                return
+
+        rows = slice(self.rows, self.rows + num_players)
+        chunk = self.current
+        chunk['step'][rows] = step
+        chunk['frame_num'][rows] = frame_num
+        chunk['seconds_elapsed'][rows] = seconds_elapsed
+        chunk['car_id'][rows] = np.arange(num_players)
+        chunk['team'][rows] = teams
+        chunk['raw'][rows] = raw_rewards
+        if active_mask is not None and not active_mask.all():
+            chunk['raw'][rows][:, ~active_mask] = np.nan
+        np.multiply(chunk['raw'][rows], weights, out=chunk['weighted'][rows])
+        chunk['configuration_rewards'][rows] = configuration_rewards
+        self.rows += num_players
+
+    def _submit(self):
+        # Hands the current chunk to the writer thread and takes the next free one, if there is one
+        if self.current is None or self.rows == 0:
+            return
+        self.full_chunks.put((self.current, self.rows, self.reward_names, self.configuration_names))
+        self.current = None
+        self.rows = 0
+        try:
+            self.current = self.free_chunks.get_nowait()
+        except queue.Empty:
+            pass
+
+    def close(self) -> int:
+        # Returns the number of rows that were dropped because the writer thread fell behind
+        self._submit()
+        self.full_chunks.put(None)
+        self.thread.join()
+        return self.dropped_rows
+
+    def _run(self):
+        while True:
+            item = self.full_chunks.get()
+            if item is None:
+                return
+            chunk, rows, reward_names, configuration_names = item
+            path = os.path.join(self.directory, f"shard_{self.shard_index:05d}.npz")
+            self.shard_index += 1
+            np.savez(path, reward_names=np.asarray(reward_names), configuration_names=np.asarray(configuration_names),
+                     **{name: column[:rows] for name, column in chunk.items()})
+            # Chunks from before a change of rewards are not reused
+            if any(chunk is current_chunk for current_chunk in self.chunks):
+                self.free_chunks.put(chunk)
+
+
+def load_telemetry(directory: str):
+    # Reads every shard of an export into one pandas DataFrame with raw.<reward>, weighted.<reward>
+    # and reward.<configuration> columns. raw and weighted are NaN on steps where the reward was skipped.
+    import pandas as pd
+
+    frames = []
+    for path in sorted(glob.glob(os.path.join(directory, "shard_*.npz"))):
+        with np.load(path) as shard:
+            names = list(shard['reward_names'])
+            # Rewards of the same class get a suffix so every column stays unique
+            columns = []
+            for name in names:
+                column = name
+                suffix = 2
+                while column in columns:
+                    column = f"{name}#{suffix}"
+                    suffix += 1
+                columns.append(column)
+            data = {key: shard[key] for key in ('step', 'frame_num', 'seconds_elapsed', 'car_id', 'team')}
+            for i, column in enumerate(columns):
+                data[f"raw.{column}"] = shard['raw'][:, i]
+                data[f"weighted.{column}"] = shard['weighted'][:, i]
+            for i, name in enumerate(shard['configuration_names']):
+                data[f"reward.{name}"] = shard['configuration_rewards'][:, i]
+            frames.append(pd.DataFrame(data))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
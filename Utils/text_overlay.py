@@ -0,0 +1,44 @@
+import time
+
+
+class TextOverlay:
+    # Keeps one RLBot render group in sync with a list of (x, y, text, color name) blocks.
+    # Every block is one draw_string_2d call with multi-line text, and the group is only sent again when
+    # the blocks changed, at most max_renders_per_second times. A change that arrives too early is kept
+    # and sent by a later update() or flush().
+    def __init__(self, renderer, colors, max_renders_per_second: float = 20, group_id: str = 'RewardTester'):
+        self.renderer = renderer
+        self.colors = colors  # Anything with the renderer's color methods, e.g. lime()
+        self.min_interval = 1 / max_renders_per_second if max_renders_per_second > 0 else 0
+        self.group_id = group_id
+        self.shown = ()
+        self.pending = None
+        self.last_send_time = -float('inf')
+        self.renders_sent = 0
+
+    def update(self, blocks, now: float = None):
+        blocks = tuple(blocks)
+        if blocks == self.shown:
+            self.pending = None
+            return
+        self.pending = blocks
+        self.flush(now)
+
+    def clear(self, now: float = None):
+        self.update((), now)
+
+    def flush(self, now: float = None):
+        # Sends the pending blocks if the render rate allows it
+        if self.pending is None:
+            return
+        now = time.perf_counter() if now is None else now
+        if now - self.last_send_time < self.min_interval:
+            return
+        self.renderer.begin_rendering(self.group_id)
+        for x, y, text, color in self.pending:
+            self.renderer.draw_string_2d(x, y, 1, 1, text, getattr(self.colors, color)())
+        self.renderer.end_rendering()
+        self.shown = self.pending
+        self.pending = None
+        self.last_send_time = now
+        self.renders_sent += 1
@@ -0,0 +1,188 @@
+import numpy as np
+
+from rlbot.utils.structures.game_data_struct import GameTickPacket, Physics, MAX_BOOSTS
+
+from .input_snapshot import INPUT_CHANNELS
+
+TRACE_VERSION = 2  # Version 2 added spawn_id to the cars, version 1 traces are still read
+
+# Physics rows: location, rotation (pitch, yaw, roll), velocity, angular velocity
+TICK_DTYPE = np.dtype([
+    ('frame_num', np.int32),
+    ('seconds_elapsed', np.float32),
+    ('is_round_active', np.bool_),
+    ('is_kickoff_pause', np.bool_),
+    ('is_match_ended', np.bool_),
+    ('score', np.int32, 2),
+    ('num_cars', np.int32),
+    ('num_boost', np.int32),
+    ('boost_pads', np.bool_, MAX_BOOSTS),
+    ('latest_touch_time', np.float32),
+    ('latest_touch_player', np.int32),
+    ('ball', np.float32, (4, 3)),
+])
+
+CAR_DTYPE = np.dtype([
+    ('physics', np.float32, (4, 3)),
+    ('team', np.uint8),
+    ('boost', np.int32),
+    ('has_wheel_contact', np.bool_),
+    ('jumped', np.bool_),
+    ('double_jumped', np.bool_),
+    ('is_demolished', np.bool_),
+    ('score_info', np.int32, 5),  # goals, saves, shots, demolitions, assists
+    ('spawn_id', np.int32),
+    ('inputs', np.float32, len(INPUT_CHANNELS)),
+])
+
+
+def _write_physics(out: np.ndarray, physics: Physics):
+    out[0] = (physics.location.x, physics.location.y, physics.location.z)
+    out[1] = (physics.rotation.pitch, physics.rotation.yaw, physics.rotation.roll)
+    out[2] = (physics.velocity.x, physics.velocity.y, physics.velocity.z)
+    out[3] = (physics.angular_velocity.x, physics.angular_velocity.y, physics.angular_velocity.z)
+
+
+def _read_physics(physics: Physics, values: np.ndarray):
+    physics.location.x, physics.location.y, physics.location.z = values[0].tolist()
+    physics.rotation.pitch, physics.rotation.yaw, physics.rotation.roll = values[1].tolist()
+    physics.velocity.x, physics.velocity.y, physics.velocity.z = values[2].tolist()
+    physics.angular_velocity.x, physics.angular_velocity.y, physics.angular_velocity.z = values[3].tolist()
+
+
+class TraceWriter:
+    # Appends ticks to preallocated chunks and writes every full chunk as a pair of .npy arrays
+    def __init__(self, path: str, tick_skip: int = 8, chunk_ticks: int = 1024, max_cars: int = 8):
+        self.file = open(path, 'wb')
+        self.chunk_ticks = chunk_ticks
+        self.ticks = np.zeros(chunk_ticks, dtype=TICK_DTYPE)
+        self.cars = np.zeros(chunk_ticks * max_cars, dtype=CAR_DTYPE)
+        self.num_ticks = 0
+        self.num_car_rows = 0
+        np.save(self.file, np.array([TRACE_VERSION, tick_skip], dtype=np.int32))
+
+    def write(self, packet: GameTickPacket, player_inputs=None):
+        # player_inputs holds the latest controller state of every car index, one row per index in INPUT_CHANNELS order
+        num_cars = packet.num_cars
+        if self.num_car_rows + num_cars > len(self.cars):
+            self.flush()
+            if num_cars > len(self.cars):
+                self.cars = np.zeros(num_cars * self.chunk_ticks, dtype=CAR_DTYPE)
+
+        tick = self.ticks[self.num_ticks]
+        game_info = packet.game_info
+        tick['frame_num'] = game_info.frame_num
+        tick['seconds_elapsed'] = game_info.seconds_elapsed
+        tick['is_round_active'] = game_info.is_round_active
+        tick['is_kickoff_pause'] = game_info.is_kickoff_pause
+        tick['is_match_ended'] = game_info.is_match_ended
+        tick['score'] = (packet.teams[0].score, packet.teams[1].score)
+        tick['num_cars'] = num_cars
+        tick['num_boost'] = packet.num_boost
+        tick['boost_pads'][:packet.num_boost] = [packet.game_boosts[i].is_active for i in range(packet.num_boost)]
+        tick['latest_touch_time'] = packet.game_ball.latest_touch.time_seconds
+        tick['latest_touch_player'] = packet.game_ball.latest_touch.player_index
+        _write_physics(tick['ball'], packet.game_ball.physics)
+
+        for i in range(num_cars):
+            car = self.cars[self.num_car_rows + i]
+            player_info = packet.game_cars[i]
+            _write_physics(car['physics'], player_info.physics)
+            car['team'] = player_info.team
+            car['boost'] = player_info.boost
+            car['has_wheel_contact'] = player_info.has_wheel_contact
+            car['jumped'] = player_info.jumped
+            car['double_jumped'] = player_info.double_jumped
+            car['is_demolished'] = player_info.is_demolished
+            car['spawn_id'] = player_info.spawn_id
+            score_info = player_info.score_info
+            car['score_info'] = (score_info.goals, score_info.saves, score_info.shots, score_info.demolitions, score_info.assists)
+
+        cars_inputs = self.cars['inputs'][self.num_car_rows:self.num_car_rows + num_cars]
+        cars_inputs[:] = 0
+        if player_inputs is not None:
+            num_known = min(num_cars, len(player_inputs))
+            cars_inputs[:num_known] = player_inputs[:num_known]
+        self.num_ticks += 1
+        self.num_car_rows += num_cars
+        if self.num_ticks == self.chunk_ticks:
+            self.flush()
+
+    def flush(self):
+        if self.num_ticks == 0:
+            return
+        np.save(self.file, self.ticks[:self.num_ticks])
+        np.save(self.file, self.cars[:self.num_car_rows])
+        self.file.flush()
+        self.ticks[:] = 0
+        self.num_ticks = 0
+        self.num_car_rows = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class TraceReader:
+    # Iterates over a trace, refilling one GameTickPacket in place for every recorded tick
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as file:
+            header = np.load(file)
+        if header[0] not in (1, TRACE_VERSION):
+            raise ValueError(f"Unsupported trace version {header[0]} in {path}")
+        self.tick_skip = int(header[1])
+        self.packet = GameTickPacket()
+        self.inputs = np.zeros((0, len(INPUT_CHANNELS)), dtype=np.float32)
+
+    def chunks(self):
+        with open(self.path, 'rb') as file:
+            np.load(file)
+            while True:
+                try:
+                    ticks = np.load(file)
+                except EOFError:
+                    return
+                cars = np.load(file)
+                yield ticks, cars
+
+    def __iter__(self):
+        # Yields (packet, inputs) where inputs is a (num_cars, len(INPUT_CHANNELS)) array
+        packet = self.packet
+        for ticks, cars in self.chunks():
+            car_row = 0
+            for tick in ticks:
+                num_cars = int(tick['num_cars'])
+                game_info = packet.game_info
+                game_info.frame_num = int(tick['frame_num'])
+                game_info.seconds_elapsed = float(tick['seconds_elapsed'])
+                game_info.is_round_active = bool(tick['is_round_active'])
+                game_info.is_kickoff_pause = bool(tick['is_kickoff_pause'])
+                game_info.is_match_ended = bool(tick['is_match_ended'])
+                packet.teams[0].score, packet.teams[1].score = tick['score'].tolist()
+                packet.num_cars = num_cars
+                packet.num_boost = int(tick['num_boost'])
+                for i, is_active in enumerate(tick['boost_pads'][:packet.num_boost].tolist()):
+                    packet.game_boosts[i].is_active = is_active
+                packet.game_ball.latest_touch.time_seconds = float(tick['latest_touch_time'])
+                packet.game_ball.latest_touch.player_index = int(tick['latest_touch_player'])
+                _read_physics(packet.game_ball.physics, tick['ball'])
+
+                tick_cars = cars[car_row:car_row + num_cars]
+                car_row += num_cars
+                has_spawn_ids = 'spawn_id' in tick_cars.dtype.names
+                for i, car in enumerate(tick_cars):
+                    player_info = packet.game_cars[i]
+                    _read_physics(player_info.physics, car['physics'])
+                    player_info.team = int(car['team'])
+                    player_info.boost = int(car['boost'])
+                    player_info.has_wheel_contact = bool(car['has_wheel_contact'])
+                    player_info.jumped = bool(car['jumped'])
+                    player_info.double_jumped = bool(car['double_jumped'])
+                    player_info.is_demolished = bool(car['is_demolished'])
+                    player_info.spawn_id = int(car['spawn_id']) if has_spawn_ids else 0
+                    score_info = player_info.score_info
+                    score_info.goals, score_info.saves, score_info.shots, score_info.demolitions, score_info.assists = car['score_info'].tolist()
+
+                self.inputs = tick_cars['inputs']
+                yield packet, self.inputs
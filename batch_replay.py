@@ -0,0 +1,102 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Utils.reward_stats import merge_summaries, summary_std
+
+from replay import replay_trace
+
+
+def score_match(path, tick_skip=None):
+    # Runs in a worker process. replay_trace builds its own GameState and rewards from create_reward_functions,
+    # so the per-car state of stateful rewards never leaks from one match into another
+    start_time = time.perf_counter()
+    results = replay_trace(path, tick_skip=tick_skip)
+    return {
+        'path': path,
+        'ticks': results['ticks'],
+        'steps': results['steps'],
+        'skipped_frames': results['skipped_frames'],
+        'seconds': time.perf_counter() - start_time,
+        'reward_names': results['reward_names'],
+        'player_totals': results['player_totals'],
+        'component_totals': [total for _, total in results['component_totals']],
+        'stats': results['reward_stats'].summary(),
+    }
+
+
+def merge_matches(summaries):
+    # Totals are summed and the per reward statistics combined over every match
+    merged = {
+        'matches': len(summaries),
+        'ticks': sum(summary['ticks'] for summary in summaries),
+        'steps': sum(summary['steps'] for summary in summaries),
+        'skipped_frames': sum(summary['skipped_frames'] for summary in summaries),
+        'reward_names': summaries[0]['reward_names'],
+        'component_totals': [sum(totals) for totals in zip(*(summary['component_totals'] for summary in summaries))],
+        'stats': summaries[0]['stats'],
+    }
+    for summary in summaries[1:]:
+        if summary['reward_names'] != merged['reward_names']:
+            raise ValueError(f"{summary['path']} was scored with different rewards than {summaries[0]['path']}")
+        merged['stats'] = merge_summaries(merged['stats'], summary['stats'])
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every recorded trace in a directory with the rewards of RewardTester.py, in parallel")
+    parser.add_argument("directory", help="Directory with traces written with record_trace_path")
+    parser.add_argument("--pattern", default="*.trace", help="File name pattern of the traces in the directory")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes, defaults to the number of CPUs")
+    parser.add_argument("--tick-skip", type=int, default=None, help="Defaults to the tick skip each trace was recorded with")
+    parser.add_argument("--output", default=None, help="Also write the per match and merged summaries to this JSON file")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.directory, args.pattern)))
+    if not paths:
+        print(f"No traces matching {args.pattern} in {args.directory}")
+        return
+
+    start_time = time.perf_counter()
+    summaries = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(score_match, path, args.tick_skip): path for path in paths}
+        for future in as_completed(futures):
+            # One broken trace should not throw away the rest of the batch
+            try:
+                summary = future.result()
+            except Exception as exception:
+                print(f"Failed to score {futures[future]}: {exception!r}")
+                continue
+            summaries.append(summary)
+            print(f"Scored {summary['path']}: {summary['steps']} steps in {summary['seconds']:.2f}s")
+    elapsed = time.perf_counter() - start_time
+    if not summaries:
+        return
+
+    summaries.sort(key=lambda summary: summary['path'])
+    merged = merge_matches(summaries)
+    stats = merged['stats']
+    std = summary_std(stats)
+    print(f"Scored {merged['matches']}/{len(paths)} matches ({merged['ticks']} ticks, {merged['steps']} steps, {merged['skipped_frames']} skipped frames) in {elapsed:.2f}s")
+    print("--------------------------")
+    for i, name in enumerate(merged['reward_names']):
+        if stats['count'][i] == 0:
+            continue
+        print(f"{name}: total {merged['component_totals'][i]:.6f} mean {stats['mean'][i]:.6f} std {std[i]:.6f} "
+              f"min {stats['min'][i]:.6f} max {stats['max'][i]:.6f} (n={stats['count'][i]})")
+    print("--------------------------")
+
+    if args.output is not None:
+        def to_json(summary):
+            return {**summary, 'stats': {key: value.tolist() for key, value in summary['stats'].items()}, 'std': summary_std(summary['stats']).tolist()}
+
+        with open(args.output, 'w') as file:
+            json.dump({'merged': to_json(merged), 'matches': [to_json(summary) for summary in summaries]}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import time
+import numpy as np
+
+from Utils.fake_rlbot import RandomPacketSource
+from Utils.game_state import GameState
+from Utils.physics_object import PhysicsObject
+from Utils.reward_batch import get_rewards
+
+from RewardTester import create_reward_functions
+from headless import HeadlessRewardTester, create_load_test_reward_functions
+
+PLAYER_COUNTS = (1, 2, 4, 6, 8)
+
+
+def summarize(durations_ns):
+    # Microseconds per tick
+    durations = np.asarray(durations_ns, dtype=np.float64) / 1000
+    return {
+        'mean_us': float(durations.mean()),
+        'median_us': float(np.median(durations)),
+        'p99_us': float(np.percentile(durations, 99)),
+        'min_us': float(durations.min()),
+        'max_us': float(durations.max()),
+        'samples': int(len(durations)),
+    }
+
+
+def benchmark_components(num_players, num_ticks, seed=0):
+    results = {}
+    source = RandomPacketSource(num_players, seed=seed)
+    game_state = GameState(None)
+    reward_functions = list(create_reward_functions())
+    # Separate instances for the scalar path, stateful rewards would otherwise be updated twice per tick
+    scalar_reward_functions = list(create_reward_functions())
+    physics_object = PhysicsObject()
+    inverted_physics_object = PhysicsObject()
+
+    timings = {name: [] for name in ('GameState.decode', 'PhysicsObject.decode_car_data', 'PhysicsObject.invert', 'PhysicsObject.rotation_mtx',
+                                     'PhysicsBatch.inverted', 'PhysicsBatch.rotation_mtxs')}
+    reward_names = [type(reward_function).__name__ for reward_function in reward_functions]
+    reward_timings = [[] for _ in reward_functions]
+    scalar_reward_timings = [[] for _ in reward_functions]
+
+    # Let the cars and ball spread out before measuring
+    for _ in range(120):
+        game_state.decode(source.next_packet())
+
+    perf_counter_ns = time.perf_counter_ns
+    for _ in range(num_ticks):
+        packet = source.next_packet()
+
+        start = perf_counter_ns()
+        game_state.decode(packet)
+        timings['GameState.decode'].append(perf_counter_ns() - start)
+
+        # Physics timings cover every car in the tick
+        decode_time = invert_time = rotation_time = 0
+        for i in range(packet.num_cars):
+            start = perf_counter_ns()
+            physics_object.decode_car_data(packet.game_cars[i].physics)
+            decode_end = perf_counter_ns()
+            inverted_physics_object.invert(physics_object)
+            invert_end = perf_counter_ns()
+            physics_object.rotation_mtx()
+            rotation_end = perf_counter_ns()
+            decode_time += decode_end - start
+            invert_time += invert_end - decode_end
+            rotation_time += rotation_end - invert_end
+        timings['PhysicsObject.decode_car_data'].append(decode_time)
+        timings['PhysicsObject.invert'].append(invert_time)
+        timings['PhysicsObject.rotation_mtx'].append(rotation_time)
+
+        # The same work for all cars of the tick at once, on the batch GameState.decode just filled
+        start = perf_counter_ns()
+        game_state.cars.inverted()
+        invert_end = perf_counter_ns()
+        game_state.cars.rotation_mtxs()
+        rotation_end = perf_counter_ns()
+        timings['PhysicsBatch.inverted'].append(invert_end - start)
+        timings['PhysicsBatch.rotation_mtxs'].append(rotation_end - invert_end)
+
+        for i, (reward_function, scalar_reward_function) in enumerate(zip(reward_functions, scalar_reward_functions)):
+            start = perf_counter_ns()
+            get_rewards(reward_function, game_state)
+            batch_end = perf_counter_ns()
+            for player_data in game_state.players:
+                scalar_reward_function.get_reward(player_data, game_state, None)
+            scalar_end = perf_counter_ns()
+            reward_timings[i].append(batch_end - start)
+            scalar_reward_timings[i].append(scalar_end - batch_end)
+
+    for name, durations in timings.items():
+        results[name] = summarize(durations)
+    for i, name in enumerate(reward_names):
+        # Same reward class listed twice gets a suffix so both stay in the results
+        key = f"reward.{name}"
+        suffix = 2
+        while key in results:
+            key = f"reward.{name}#{suffix}"
+            suffix += 1
+        results[key] = summarize(reward_timings[i])
+        results[key + '.scalar'] = summarize(scalar_reward_timings[i])
+    return results
+
+
+def benchmark_step(num_players, num_ticks, seed=0):
+    # Full start() loop on the fake backend with printing sent to devnull and rendering going to the NullRenderer.
+    # Zero-weight rewards are skipped, so every default reward gets weight 1.0 to include their cost.
+    reward_tester = HeadlessRewardTester(RandomPacketSource(num_players, num_ticks, seed))
+    reward_tester.reward_functions = create_load_test_reward_functions(len(create_reward_functions()))
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        reward_tester.start()
+
+    tick_skip = reward_tester.tick_skip
+    durations = np.asarray(reward_tester.tick_durations[120:])
+    num_windows = len(durations) // tick_skip
+    step_durations = durations[:num_windows * tick_skip].reshape(num_windows, tick_skip).sum(axis=1)
+    budget = tick_skip / 120
+    return {
+        'RewardTester.tick': summarize(durations * 1e9),
+        'RewardTester.step': {
+            **summarize(step_durations * 1e9),
+            'budget_us': budget * 1e6,
+            'over_budget': int((step_durations > budget).sum()),
+        },
+    }
+
+
+def compare(old_results, new_results):
+    print(f"{'players':>7}  {'benchmark':<48}{'old mean us':>14}{'new mean us':>14}{'ratio':>8}")
+    for players, benchmarks in new_results['results'].items():
+        old_benchmarks = old_results['results'].get(players, {})
+        for name, stats in benchmarks.items():
+            if name not in old_benchmarks:
+                continue
+            old_mean = old_benchmarks[name]['mean_us']
+            ratio = stats['mean_us'] / old_mean if old_mean else float('nan')
+            print(f"{players:>7}  {name:<48}{old_mean:>14.2f}{stats['mean_us']:>14.2f}{ratio:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GameState decoding, physics, rewards and the full RewardTester step")
+    parser.add_argument("--players", type=int, nargs="+", default=list(PLAYER_COUNTS))
+    parser.add_argument("--ticks", type=int, default=1200, help="Ticks measured per player count")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", default=None, help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = {}
+    for num_players in args.players:
+        print(f"Benchmarking {num_players} players...")
+        results[str(num_players)] = {
+            **benchmark_components(num_players, args.ticks, args.seed),
+            **benchmark_step(num_players, args.ticks + 120, args.seed),
+        }
+
+    output = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'ticks': args.ticks,
+            'seed': args.seed,
+            'step_rewards': 'every default reward with weight 1.0',
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(output, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    for num_players, benchmarks in results.items():
+        step = benchmarks['RewardTester.step']
+        print(f"{num_players} players, all rewards weighted: step mean {step['mean_us']:.1f} us, p99 {step['p99_us']:.1f} us, "
+              f"{step['over_budget']}/{step['samples']} steps over the {step['budget_us']:.0f} us budget")
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            compare(json.load(file), output)
+
+
+if __name__ == "__main__":
+    main()
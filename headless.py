@@ -0,0 +1,98 @@
+import argparse
+import contextlib
+import os
+import time
+import numpy as np
+
+from Utils.fake_rlbot import HeadlessScript, RandomPacketSource, TracePacketSource, PacketSourceExhausted
+
+from RewardTester import RewardTester, create_reward_functions
+
+
+class HeadlessRewardTester(RewardTester, HeadlessScript):
+    # RewardTester on top of the fake RLBot backend without the keyboard hotkeys, start() returns once the packet source runs out
+    def __init__(self, packet_source, realtime=False, drop_rate=0.0):
+        self.packet_source = packet_source
+        self.realtime = realtime
+        self.drop_rate = drop_rate
+        super().__init__(enable_hotkeys=False)
+        self.socket_relay = self.fake_socket_relay
+
+    def start(self):
+        try:
+            super().start()
+        except PacketSourceExhausted:
+            pass
+        finally:
+            self.socket_relay.disconnect()
+
+
+def create_load_test_reward_functions(num_rewards, weight=1.0):
+    # Repeats the default rewards with a non-zero weight until there are num_rewards of them
+    reward_functions = {}
+    while len(reward_functions) < num_rewards:
+        for reward_function in create_reward_functions():
+            if len(reward_functions) == num_rewards:
+                break
+            reward_functions[reward_function] = weight
+    return reward_functions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run RewardTester headless on synthetic or recorded packets")
+    parser.add_argument("--cars", type=int, default=8, help="Number of cars for randomized packets")
+    parser.add_argument("--ticks", type=int, default=120 * 60, help="Number of randomized ticks to run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--trace", default=None, help="Replay a recorded trace through start() instead of randomized packets")
+    parser.add_argument("--rewards", type=int, default=None, help="Load test with this many rewards, all with weight 1.0")
+    parser.add_argument("--realtime", action="store_true", help="Pace packets at 120 Hz instead of running as fast as possible")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Chance of missing each packet, to test stepping under lag")
+    parser.add_argument("--profile", default=None, help="Write the stage and reward timings to this JSON file")
+    parser.add_argument("--show-output", action="store_true", help="Print to the console instead of discarding the output")
+    args = parser.parse_args()
+
+    if args.trace is not None:
+        packet_source = TracePacketSource(args.trace)
+    else:
+        packet_source = RandomPacketSource(args.cars, args.ticks, args.seed)
+    reward_tester = HeadlessRewardTester(packet_source, args.realtime, args.drop_rate)
+    if args.rewards is not None:
+        reward_tester.reward_functions = create_load_test_reward_functions(args.rewards)
+    reward_tester.profile_export_path = args.profile
+
+    start_time = time.perf_counter()
+    if args.show_output:
+        reward_tester.start()
+    else:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            reward_tester.start()
+    elapsed = time.perf_counter() - start_time
+
+    # Every tick_skip ticks have to be processed within tick_skip / 120 seconds to keep up with the game
+    durations = np.asarray(reward_tester.tick_durations)
+    tick_skip = reward_tester.tick_skip
+    budget = tick_skip / 120
+    num_windows = len(durations) // tick_skip
+    window_durations = durations[:num_windows * tick_skip].reshape(num_windows, tick_skip).sum(axis=1)
+    ticks_per_second = len(durations) / max(elapsed, 1e-9)
+
+    print(f"Processed {len(durations)} ticks with {len(reward_tester.game_state.players)} cars and {len(reward_tester.reward_functions)} rewards in {elapsed:.3f}s")
+    print(f"{ticks_per_second:.0f} ticks/s ({ticks_per_second / 120:.1f}x real time)")
+    if len(durations):
+        print(f"Tick time mean {durations.mean() * 1000:.3f} ms, p99 {np.percentile(durations, 99) * 1000:.3f} ms, max {durations.max() * 1000:.3f} ms")
+    if num_windows:
+        overruns = int((window_durations > budget).sum())
+        print(f"Step budget {budget * 1000:.1f} ms: worst {window_durations.max() * 1000:.3f} ms, {overruns}/{num_windows} steps over budget")
+    frame_stepper = reward_tester.frame_stepper
+    print(f"Skipped frames: {frame_stepper.skipped_frames} ({frame_stepper.skipped_steps} whole steps)")
+    renderer = reward_tester.game_interface.renderer
+    print(f"Rendering: {renderer.render_groups} render groups, {renderer.draw_calls} draw calls")
+    if reward_tester.profiler is not None:
+        print("Slowest rewards:")
+        for line in reward_tester.profiler.format_lines(5)[1:]:
+            print(f"  {line}", end="")
+    print("Keeps up with 120 Hz" if ticks_per_second >= 120 else "Does NOT keep up with 120 Hz")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import time
+import numpy as np
+
+from Utils.game_state import GameState
+from Utils.reward_batch import RewardPlan
+from Utils.trace import TraceReader
+from Utils.frame_stepper import FrameStepper
+from Utils.round_tracker import RoundTracker, GOAL
+from Utils.reward_stats import RewardStats
+
+from RewardTester import create_reward_functions
+
+
+def replay_trace(path, reward_functions=None, tick_skip=None, weight_configurations=None):
+    # Runs a recorded trace through GameState and the reward functions without the game running.
+    # Every reward is evaluated, including zero weight ones, so component_totals and reward_stats cover all of them.
+    reader = TraceReader(path)
+    tick_skip = tick_skip or reader.tick_skip
+    reward_functions = reward_functions if reward_functions is not None else create_reward_functions()
+    reward_plan = RewardPlan(reward_functions, weight_configurations, evaluate_all=True)
+    game_state = GameState(None, tick_skip)
+
+    frame_stepper = FrameStepper(tick_skip)
+    round_tracker = RoundTracker()
+    round_needs_reset = True
+    num_ticks = 0
+    num_steps = 0
+    player_totals = {}
+    component_totals = np.zeros(len(reward_functions))
+    configuration_totals = np.zeros(len(reward_plan.configuration_names))
+    reward_stats = RewardStats(len(reward_functions))
+
+    for packet, inputs in reader:
+        num_ticks += 1
+        frames_elapsed = frame_stepper.advance(packet.game_info.frame_num)
+        if frames_elapsed == 0:
+            continue
+        # Same round handling as RewardTester.run
+        round_event = round_tracker.update(packet)
+        is_goal = round_event == GOAL
+        if round_event is not None and not is_goal:
+            round_needs_reset = True
+
+        if not packet.game_info.is_round_active and not is_goal:
+            game_state.update_counters(packet, frames_elapsed)
+            continue
+
+        if not frame_stepper.is_step(frames_elapsed, force=is_goal):
+            game_state.update_counters(packet, frames_elapsed)
+            continue
+
+        game_state.decode(packet, frames_elapsed)
+        game_state.inputs[:] = inputs
+
+        if round_needs_reset:
+            round_needs_reset = False
+            reward_plan.reset(game_state)
+        component_rewards = reward_plan.get_reward_matrix(game_state)
+        if is_goal:
+            round_needs_reset = True
+        reward_stats.update(component_rewards, reward_plan.active_mask)
+        configuration_rewards = component_rewards @ reward_plan.weight_matrix
+        player_rewards = configuration_rewards[:, 0]
+        component_totals += component_rewards.sum(axis=0)
+        configuration_totals += configuration_rewards.sum(axis=0)
+        for player_data, player_reward in zip(game_state.players, player_rewards.tolist()):
+            player_totals[player_data.car_id] = player_totals.get(player_data.car_id, 0) + player_reward
+        num_steps += 1
+
+    return {
+        'ticks': num_ticks,
+        'steps': num_steps,
+        'skipped_frames': frame_stepper.skipped_frames,
+        'skipped_steps': frame_stepper.skipped_steps,
+        'round_events': dict(round_tracker.counts),
+        'player_totals': player_totals,
+        'component_totals': list(zip((type(reward_function).__name__ for reward_function in reward_functions), component_totals.tolist())),
+        'configuration_totals': list(zip(reward_plan.configuration_names, configuration_totals.tolist())),
+        'reward_names': reward_plan.reward_names,
+        'reward_stats': reward_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded trace through the reward functions of RewardTester.py")
+    parser.add_argument("trace", help="Trace file written with record_trace_path")
+    parser.add_argument("--tick-skip", type=int, default=None, help="Defaults to the tick skip the trace was recorded with")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    results = replay_trace(args.trace, tick_skip=args.tick_skip)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"Replayed {results['ticks']} ticks ({results['steps']} steps) in {elapsed:.3f}s, {results['ticks'] / max(elapsed, 1e-9):.0f} ticks/s")
+    print(f"Skipped frames: {results['skipped_frames']} ({results['skipped_steps']} whole steps)")
+    print("Round events: " + ", ".join(f"{name} {count}" for name, count in results['round_events'].items()))
+    print("--------------------------")
+    for player_id, total_reward in sorted(results['player_totals'].items()):
+        print(f"Player {player_id} total reward: {total_reward:.6f}")
+        print(f"Player {player_id} average step reward: {total_reward / max(results['steps'], 1):.6f}")
+    print("--------------------------")
+    for name, total_reward in results['component_totals']:
+        print(f"{name} raw total: {total_reward:.6f}")
+    if len(results['configuration_totals']) > 1:
+        print("--------------------------")
+        for name, total_reward in results['configuration_totals']:
+            print(f"Configuration {name} total reward: {total_reward:.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 import numpy as np
-from Utils.common_values import BALL_RADIUS, CAR_MAX_SPEED, BALL_MAX_SPEED, ORANGE_GOAL_BACK, BLUE_GOAL_BACK, BACK_NET_Y, BACK_WALL_Y, CEILING_Z, SIDE_WALL_X
-from Utils.player_data import global_player_data
+from rlbot.utils.structures.game_data_struct import MAX_PLAYERS
+from Utils.common_values import BALL_RADIUS, CAR_MAX_SPEED, BALL_MAX_SPEED, BACK_NET_Y, BACK_WALL_Y
+from Utils.field_geometry import GOAL_BACKS, target_goals, distance_to_nearest_wall, distance_to_floor, distance_to_ceiling, distances_to_goals
 
 
-from collections import defaultdict
+# Stateful rewards keep per-car state in arrays with one row per car slot (player_data.car_id), so it stays bounded
+# no matter how many cars come and go. RewardTester calls reset(initial_state) at the start of every round.
 
 class EventReward:
     def __init__(self, weight_scales):
@@ -18,51 +20,47 @@ class EventReward:
             'boost_fraction': weight_scales.get('boostPickup', 0.0),
             'assists': weight_scales.get('assist', 0.0)
         }
-        self.prev_values = defaultdict(dict)
+        self.weight_vector = np.array(list(self.weights.values()))
+        # One row of values per car slot, in the order of self.weights
+        self.prev_values = np.zeros((MAX_PLAYERS, len(self.weights)))
+        self.has_prev_values = np.zeros(MAX_PLAYERS, dtype=bool)
 
-    def get_reward(self, player_data, game_state, prev_action):
+    def reset(self, initial_state):
+        self.has_prev_values[:] = False
+        self.update_state(initial_state)
+
+    def _current_values(self, player_data, game_state):
         team_goals = game_state.scoreLine[int(player_data.team_num)]
         opponent_goals = game_state.scoreLine[1 - int(player_data.team_num)]
+        return (
+            team_goals,
+            opponent_goals,
+            player_data.ball_touched,
+            player_data.match_shots,
+            player_data.match_saves,
+            player_data.match_demolishes,
+            player_data.is_demoed,
+            player_data.boost_amount,
+            player_data.match_assists,
+        )
+
+    def update_state(self, game_state):
+        # Keeps prev_values current while the reward is not being evaluated
+        for player_data in game_state.players:
+            self.prev_values[player_data.car_id] = self._current_values(player_data, game_state)
+            self.has_prev_values[player_data.car_id] = True
+
+    def get_reward(self, player_data, game_state, prev_action):
         car_id = player_data.car_id
+        values = np.array(self._current_values(player_data, game_state), dtype=np.float64)
 
         reward = 0
+        # Every event is a value going up, for touch and demoed that is False -> True
+        if self.has_prev_values[car_id]:
+            reward = float(self.weight_vector @ (values > self.prev_values[car_id]))
 
-        if car_id not in self.prev_values:
-            self.prev_values[car_id] = {
-                'team_goals': team_goals,
-                'opponent_goals': opponent_goals,
-                'touch': player_data.ball_touched,
-                'shots': player_data.match_shots,
-                'saves': player_data.match_saves,
-                'demos': player_data.match_demolishes,
-                'demoed': player_data.is_demoed,
-                'boost_fraction': player_data.boost_amount,
-                'assists': player_data.match_assists
-            }
-        else:
-            prev_values = self.prev_values[car_id]
-            reward += self.weights['team_goals'] * (team_goals > prev_values['team_goals'])
-            reward += self.weights['opponent_goals'] * (opponent_goals > prev_values['opponent_goals'])
-            reward += self.weights['touch'] * (player_data.ball_touched and not prev_values['touch'])
-            reward += self.weights['shots'] * (player_data.match_shots > prev_values['shots'])
-            reward += self.weights['saves'] * (player_data.match_saves > prev_values['saves'])
-            reward += self.weights['demos'] * (player_data.match_demolishes > prev_values['demos'])
-            reward += self.weights['demoed'] * (player_data.is_demoed and not prev_values['demoed'])
-            reward += self.weights['boost_fraction'] * (player_data.boost_amount > prev_values['boost_fraction'])
-            reward += self.weights['assists'] * (player_data.match_assists > prev_values['assists'])
-
-            self.prev_values[car_id] = {
-                'team_goals': team_goals,
-                'opponent_goals': opponent_goals,
-                'touch': player_data.ball_touched,
-                'shots': player_data.match_shots,
-                'saves': player_data.match_saves,
-                'demos': player_data.match_demolishes,
-                'demoed': player_data.is_demoed,
-                'boost_fraction': player_data.boost_amount,
-                'assists': player_data.match_assists
-            }
-
+        self.prev_values[car_id] = values
+        self.has_prev_values[car_id] = True
         return reward
 
 
@@ -71,7 +69,10 @@ class VelocityReward:
         self.is_negative = is_negative
 
     def get_reward(self, player_data, game_state, prev_action):
-        return np.linalg.norm(player_data.car_data.linear_velocity) / CAR_MAX_SPEED * (1 - 2 * self.is_negative)
+        return game_state.features.car_speeds[player_data.car_id] / CAR_MAX_SPEED * (1 - 2 * self.is_negative)
+
+    def get_rewards(self, game_state):
+        return game_state.features.car_speeds / CAR_MAX_SPEED * (1 - 2 * self.is_negative)
 
 class SaveBoostReward:
     def __init__(self, exponent=0.5):
@@ -80,30 +81,62 @@ class SaveBoostReward:
     def get_reward(self, player_data, game_state, prev_action):
         return np.clip(player_data.boost_amount ** self.exponent, 0, 1)
 
+    def get_rewards(self, game_state):
+        return np.clip(game_state.boost_amounts ** self.exponent, 0, 1)
+
 class VelocityBallToGoalReward:
     def __init__(self, own_goal=False):
         self.own_goal = own_goal
 
     def get_reward(self, player_data, game_state, prev_action):
-        target_orange_goal = player_data.team_num == 0
-        if self.own_goal:
-            target_orange_goal = not target_orange_goal
-
-        target_pos = ORANGE_GOAL_BACK if target_orange_goal else BLUE_GOAL_BACK
-        ball_dir_to_goal = (target_pos - game_state.ball.position) / np.linalg.norm(target_pos - game_state.ball.position)
+        target_pos = GOAL_BACKS[target_goals(player_data.team_num, self.own_goal)]
+        ball_to_goal = target_pos - game_state.ball.position
+        ball_dir_to_goal = ball_to_goal / np.linalg.norm(ball_to_goal)
         return ball_dir_to_goal.dot(game_state.ball.linear_velocity / BALL_MAX_SPEED)
 
+    def get_rewards(self, game_state):
+        # Only two possible targets, so compute both and pick per player
+        ball_to_goals = GOAL_BACKS - game_state.ball.position
+        ball_dirs_to_goals = ball_to_goals / np.linalg.norm(ball_to_goals, axis=1)[:, None]
+        goal_rewards = ball_dirs_to_goals @ (game_state.ball.linear_velocity / BALL_MAX_SPEED)
+        return goal_rewards[target_goals(game_state.team_nums, self.own_goal)]
+
+class PredictedGoalReward:
+    # Positive when the ball is predicted to go into the opponent goal, negative for the own goal, larger the sooner.
+    # Reads game_state.ball_prediction, which is fetched once per step no matter how many rewards and players use it.
+    def __init__(self, horizon=3.0):
+        self.horizon = horizon
+
+    def _team_rewards(self, game_state):
+        urgency = np.maximum(0, 1 - game_state.ball_prediction.goal_times / self.horizon)
+        # goal_times is indexed by the goal, [blue goal, orange goal], the result by the team
+        return np.array((urgency[1] - urgency[0], urgency[0] - urgency[1]))
+
+    def get_reward(self, player_data, game_state, prev_action):
+        return self._team_rewards(game_state)[player_data.team_num]
+
+    def get_rewards(self, game_state):
+        return self._team_rewards(game_state)[game_state.team_nums]
+
 class VelocityPlayerToBallReward:
     def get_reward(self, player_data, game_state, prev_action):
-        dir_to_ball = (game_state.ball.position - player_data.car_data.position) / np.linalg.norm(game_state.ball.position - player_data.car_data.position)
+        dir_to_ball = game_state.features.dir_to_ball[player_data.car_id]
         norm_vel = player_data.car_data.linear_velocity / CAR_MAX_SPEED
         return dir_to_ball.dot(norm_vel)
 
+    def get_rewards(self, game_state):
+        norm_vel = game_state.car_linear_velocities / CAR_MAX_SPEED
+        return np.einsum('ij,ij->i', game_state.features.dir_to_ball, norm_vel)
+
 class FaceBallReward:
     def get_reward(self, player_data, game_state, prev_action):
-        dir_to_ball = (game_state.ball.position - player_data.car_data.position) / np.linalg.norm(game_state.ball.position - player_data.car_data.position)
+        dir_to_ball = game_state.features.dir_to_ball[player_data.car_id]
         return player_data.car_data.forward().dot(dir_to_ball)
 
+    def get_rewards(self, game_state):
+        dir_to_ball = game_state.features.dir_to_ball
+        return np.einsum('ij,ij->i', game_state.cars.forwards(), dir_to_ball)
+
 class TouchBallReward:
     def __init__(self, aerial_weight=0):
         self.aerial_weight = aerial_weight
@@ -115,28 +148,41 @@ class TouchBallReward:
         else:
             return 0
 
+    def get_rewards(self, game_state):
+        ball_height = game_state.ball.position[2] + BALL_RADIUS
+        return np.where(game_state.ball_touched, (ball_height / (BALL_RADIUS * 2)) ** self.aerial_weight, 0.0)
+
 class DistanceToBallReward:
     def __init__(self):
         pass
 
     def get_reward(self, player_data, game_state, prev_action):
-        distance_to_ball = np.linalg.norm(player_data.car_data.position - game_state.ball.position)
+        distance_to_ball = game_state.features.distance_to_ball[player_data.car_id]
         return max(0, 1 - distance_to_ball / (BALL_RADIUS * 2))
 
+    def get_rewards(self, game_state):
+        distance_to_ball = game_state.features.distance_to_ball
+        return np.maximum(0, 1 - distance_to_ball / (BALL_RADIUS * 2))
+
 class DribbleReward:
+    MIN_BALL_HEIGHT = 109.0
+    MAX_BALL_HEIGHT = 180.0
+    MAX_DISTANCE = 197.0
+    SPEED_MATCH_FACTOR = 2.0
+
     def get_reward(self, player_data, game_state, prev_action):
-        MIN_BALL_HEIGHT = 109.0
-        MAX_BALL_HEIGHT = 180.0
-        MAX_DISTANCE = 197.0
-        SPEED_MATCH_FACTOR = 2.0
+        MIN_BALL_HEIGHT = self.MIN_BALL_HEIGHT
+        MAX_BALL_HEIGHT = self.MAX_BALL_HEIGHT
+        MAX_DISTANCE = self.MAX_DISTANCE
+        SPEED_MATCH_FACTOR = self.SPEED_MATCH_FACTOR
 
         if (
             player_data.on_ground
             and MIN_BALL_HEIGHT <= game_state.ball.position[2] <= MAX_BALL_HEIGHT
-            and np.linalg.norm(player_data.car_data.position - game_state.ball.position) < MAX_DISTANCE
+            and game_state.features.distance_to_ball[player_data.car_id] < MAX_DISTANCE
         ):
-            player_speed = np.linalg.norm(player_data.car_data.linear_velocity)
-            ball_speed = np.linalg.norm(game_state.ball.linear_velocity)
+            player_speed = game_state.features.car_speeds[player_data.car_id]
+            ball_speed = game_state.features.ball_speed
             speed_match_reward = (
                 (player_speed / CAR_MAX_SPEED)
                 + SPEED_MATCH_FACTOR
@@ -146,47 +192,97 @@ class DribbleReward:
         else:
             return 0.0
 
+    def get_rewards(self, game_state):
+        dribbling = (
+            game_state.on_ground
+            & (self.MIN_BALL_HEIGHT <= game_state.ball.position[2] <= self.MAX_BALL_HEIGHT)
+            & (game_state.features.distance_to_ball < self.MAX_DISTANCE)
+        )
+        player_speed = game_state.features.car_speeds
+        ball_speed = game_state.features.ball_speed
+        with np.errstate(divide='ignore', invalid='ignore'):
+            speed_match_reward = (
+                (player_speed / CAR_MAX_SPEED)
+                + self.SPEED_MATCH_FACTOR
+                * (1.0 - np.abs(player_speed - ball_speed) / (player_speed + ball_speed))
+            ) / 2.0
+        return np.where(dribbling, speed_match_reward, 0.0)
+
 class FlipResetReward:
+    CAR_UNDER_THRESHOLD = -1.0
+    MIN_DISTANCE_FLOOR = 200.0
+    MIN_DISTANCE_CEILING = 300.0
+    MIN_DISTANCE_WALLS = 700.0
+    ENABLE_MULTIPLE_RESETS = 1  # You might want to disable to prevent flip reset farming
+
     def __init__(self, flip_reset_r=1.0, hold_flip_reset_r=0.01):
         self.flip_reset_r = flip_reset_r
         self.hold_flip_reset_r = hold_flip_reset_r
-        self.prevhas_jump = defaultdict(bool)
-        self.prevhas_flip = defaultdict(bool)
-        self.has_reset = defaultdict(bool)
+        self.prevhas_jump = np.zeros(MAX_PLAYERS, dtype=bool)
+        self.prevhas_flip = np.zeros(MAX_PLAYERS, dtype=bool)
+        self.has_reset = np.zeros(MAX_PLAYERS, dtype=bool)
 
     def reset(self, initial_state):
-        self.prevhas_jump.clear()
-        self.prevhas_flip.clear()
-        self.has_reset.clear()
+        self.prevhas_jump[:] = False
+        self.prevhas_flip[:] = False
+        self.has_reset[:] = False
+
+    def _field_checks(self, positions):
+        # Near a wall, and too close to the floor or ceiling, for one position or all cars at once
+        near_wall = distance_to_nearest_wall(positions) < self.MIN_DISTANCE_WALLS
+        height_check = (distance_to_floor(positions) < self.MIN_DISTANCE_FLOOR) | (distance_to_ceiling(positions) < self.MIN_DISTANCE_CEILING)
+        return near_wall, height_check
+
+    def _got_reset(self, player_data):
+        car_id = player_data.car_id
+        return (self.prevhas_jump[car_id] < player_data.has_jump) or (self.ENABLE_MULTIPLE_RESETS * (self.prevhas_flip[car_id] < player_data.has_flip))
+
+    def _in_reset_position(self, player_data, game_state, height_check):
+        # Wheels on the ball, away from the floor and ceiling (walls are checked separately)
+        car_id = player_data.car_id
+        near_ball = game_state.features.distance_to_ball[car_id] < 170.0
+        Car_wheels_under = np.dot(player_data.car_data.up(), game_state.features.dir_to_ball[car_id]) > self.CAR_UNDER_THRESHOLD
+        return near_ball and not height_check and Car_wheels_under
+
+    def update_state(self, game_state):
+        # Same bookkeeping as get_reward without the reward, the position is only checked when a reset might have happened
+        near_walls, height_checks = self._field_checks(game_state.car_positions)
+        for player_data, wall_dis_check, height_check in zip(game_state.players, near_walls.tolist(), height_checks.tolist()):
+            car_id = player_data.car_id
+            if wall_dis_check or player_data.has_flipped:
+                self.has_reset[car_id] = False
+            if not wall_dis_check and not self.has_reset[car_id] and self._got_reset(player_data) and self._in_reset_position(player_data, game_state, height_check):
+                self.has_reset[car_id] = True
+            self.prevhas_jump[car_id] = player_data.has_jump
+            self.prevhas_flip[car_id] = player_data.has_flip
 
     def get_reward(self, player_data, game_state, prev_action):
-        CAR_UNDER_THRESHOLD = -1.0
-        MIN_DISTANCE_FLOOR = 200.0
-        MIN_DISTANCE_CEILING = 300.0
-        MIN_DISTANCE_WALLS = 700.0
-        ENABLE_MULTIPLE_RESETS = 1  # You might want to disable to prevent flip reset farming
+        wall_dis_check, height_check = self._field_checks(player_data.car_data.position)
+        return self._step(player_data, game_state, bool(wall_dis_check), bool(height_check))
+
+    def get_rewards(self, game_state):
+        # The wall and height tests run for all cars in one call, the reset bookkeeping stays per car
+        near_walls, height_checks = self._field_checks(game_state.car_positions)
+        return np.fromiter(
+            (self._step(player_data, game_state, wall_dis_check, height_check)
+             for player_data, wall_dis_check, height_check in zip(game_state.players, near_walls.tolist(), height_checks.tolist())),
+            dtype=np.float64,
+            count=len(game_state.players),
+        )
 
+    def _step(self, player_data, game_state, wall_dis_check, height_check):
         car_id = player_data.car_id
         reward = 0.0
 
-        near_ball = np.linalg.norm(player_data.car_data.position - game_state.ball.position) < 170.0
-        height_check = (player_data.car_data.position[2] < MIN_DISTANCE_FLOOR) or (player_data.car_data.position[2] > CEILING_Z - MIN_DISTANCE_CEILING)
-        dir_to_ball = (game_state.ball.position - player_data.car_data.position) / np.linalg.norm(game_state.ball.position - player_data.car_data.position)
-        Car_wheels_under = np.dot(player_data.car_data.up(), dir_to_ball) > CAR_UNDER_THRESHOLD
-        wall_dis_check = ((-SIDE_WALL_X + MIN_DISTANCE_WALLS) > player_data.car_data.position[0]) or \
-                         ((SIDE_WALL_X - MIN_DISTANCE_WALLS) < player_data.car_data.position[0]) or \
-                         ((-BACK_WALL_Y + MIN_DISTANCE_WALLS) > player_data.car_data.position[1]) or \
-                         ((BACK_WALL_Y - MIN_DISTANCE_WALLS) < player_data.car_data.position[1])
-
         can_jump = player_data.has_flip
         
         # player_data.has_jump = not player_info.jumped , so it only detects the initial reset . If you want to detect multiple resets you need to check if they've flipped. 
-        gotReset = (self.prevhas_jump[car_id] < player_data.has_jump) or (ENABLE_MULTIPLE_RESETS * (self.prevhas_flip[car_id] < player_data.has_flip))
+        gotReset = self._got_reset(player_data)
 
         if wall_dis_check or player_data.has_flipped:
             self.has_reset[car_id] = False
 
-        if near_ball and not height_check and not wall_dis_check and Car_wheels_under:
+        if not wall_dis_check and self._in_reset_position(player_data, game_state, height_check):
             if gotReset and not self.has_reset[car_id]:
                 self.has_reset[car_id] = True
                 reward = self.flip_reset_r
@@ -202,13 +298,7 @@ class LiuDistanceBallToGoalReward:
         self.own_goal = own_goal
 
     def get_reward(self, player_data, game_state, prev_action):
-
-        if (player_data.team_num == 0 and not self.own_goal) or (
-            player_data.team_num == 1 and self.own_goal
-        ):
-            objective = ORANGE_GOAL_BACK
-        else:
-            objective = BLUE_GOAL_BACK
+        objective = GOAL_BACKS[target_goals(player_data.team_num, self.own_goal)]
 
         dist = (
             np.linalg.norm(game_state.ball.position - objective)
@@ -218,25 +308,46 @@ class LiuDistanceBallToGoalReward:
         reward = np.exp(-0.5 * dist / BALL_MAX_SPEED)
         return reward
 
+    def get_rewards(self, game_state):
+        dist = distances_to_goals(game_state.ball.position) - (BACK_NET_Y - BACK_WALL_Y + BALL_RADIUS)
+        goal_rewards = np.exp(-0.5 * dist / BALL_MAX_SPEED)
+        return goal_rewards[target_goals(game_state.team_nums, self.own_goal)]
+
 class LiuDistancePlayerToBallReward:
     def get_reward(self, player_data, game_state, prev_action):
 
-        dist = np.linalg.norm(player_data.car_data.position - game_state.ball.position) - BALL_RADIUS
+        dist = game_state.features.distance_to_ball[player_data.car_id] - BALL_RADIUS
 
         reward = np.exp(-0.5 * dist / CAR_MAX_SPEED)
         return reward
-        
+
+    def get_rewards(self, game_state):
+        dist = game_state.features.distance_to_ball - BALL_RADIUS
+        return np.exp(-0.5 * dist / CAR_MAX_SPEED)
+
 
 class AerialDistanceReward:
     def __init__(self, height_scale, distance_scale, ang_vel_w):
         self.height_scale = height_scale
         self.distance_scale = distance_scale
         self.ang_vel_w = ang_vel_w
-        self.ball_distance = defaultdict(float)
-        self.car_distance = defaultdict(float)
-        self.ang_vel_accumulated = defaultdict(float)
-        self.prev_ball_pos = defaultdict(lambda: None)
-        self.prev_car_pos = defaultdict(lambda: None)
+        self.ball_distance = np.zeros(MAX_PLAYERS)
+        self.car_distance = np.zeros(MAX_PLAYERS)
+        self.ang_vel_accumulated = np.zeros(MAX_PLAYERS)
+        self.prev_ball_pos = np.zeros((MAX_PLAYERS, 3))
+        self.prev_car_pos = np.zeros((MAX_PLAYERS, 3))
+        self.has_prev_pos = np.zeros(MAX_PLAYERS, dtype=bool)
+
+    def reset(self, initial_state):
+        self.ball_distance[:] = 0.0
+        self.car_distance[:] = 0.0
+        self.ang_vel_accumulated[:] = 0.0
+        self.has_prev_pos[:] = False
+
+    def _set_prev_pos(self, car_id, player_data, game_state):
+        self.prev_ball_pos[car_id] = game_state.ball.position
+        self.prev_car_pos[car_id] = player_data.car_data.position
+        self.has_prev_pos[car_id] = True
 
     def get_reward(self, player_data, game_state, prev_action):
         car_id = player_data.car_id
@@ -248,18 +359,18 @@ class AerialDistanceReward:
             self.ball_distance[car_id] = 0.0
             self.car_distance[car_id] = 0.0
             self.ang_vel_accumulated[car_id] = 0.0
-            # Initialize prev_ball_pos and prev_car_pos if they are None
-            if self.prev_ball_pos[car_id] is None:
-                self.prev_ball_pos[car_id] = game_state.ball.position.copy()
-            if self.prev_car_pos[car_id] is None:
-                self.prev_car_pos[car_id] = player_data.car_data.position.copy()
+            # Initialize prev_ball_pos and prev_car_pos if they are not set yet
+            if not self.has_prev_pos[car_id]:
+                self._set_prev_pos(car_id, player_data, game_state)
         # First non-ground touch detection
         elif player_data.ball_touched:
             rew = self.height_scale * max(player_data.car_data.position[2] + game_state.ball.position[2] - 500, 0.0)
-            self.prev_ball_pos[car_id] = game_state.ball.position.copy()
-            self.prev_car_pos[car_id] = player_data.car_data.position.copy()
+            self._set_prev_pos(car_id, player_data, game_state)
         # Still off the ground after a touch, add distance and reward for more touches
         elif not player_data.on_ground:
+            # Cars first seen in the air have no previous positions to measure from yet
+            if not self.has_prev_pos[car_id]:
+                self._set_prev_pos(car_id, player_data, game_state)
             self.car_distance[car_id] += np.linalg.norm(player_data.car_data.position - self.prev_car_pos[car_id])
             self.ball_distance[car_id] += np.linalg.norm(game_state.ball.position - self.prev_ball_pos[car_id])
             ang_vel_norm = np.linalg.norm(player_data.car_data.angular_velocity) / 5.5
@@ -271,11 +382,15 @@ class AerialDistanceReward:
                 self.car_distance[car_id] = 0.0
                 self.ball_distance[car_id] = 0.0
                 self.ang_vel_accumulated[car_id] = 0.0
-                self.prev_ball_pos[car_id] = game_state.ball.position.copy()
-                self.prev_car_pos[car_id] = player_data.car_data.position.copy()
+                self._set_prev_pos(car_id, player_data, game_state)
 
         return rew / (2 * 5120)
 
+    def update_state(self, game_state):
+        # All of this reward's work is bookkeeping, so keep running it and drop the result
+        for player_data in game_state.players:
+            self.get_reward(player_data, game_state, None)
+
 
 class PositiveRollReward:
     def __init__(self, height_threshold=300.0, distance_threshold=500.0):
@@ -285,11 +400,20 @@ class PositiveRollReward:
     def get_reward(self, player_data, game_state, prev_action):
         reward = 0.0
         if player_data.car_data.position[2] > self.height_threshold and \
-           np.linalg.norm(player_data.car_data.position - game_state.ball.position) < self.distance_threshold and \
+           game_state.features.distance_to_ball[player_data.car_id] < self.distance_threshold and \
            player_data.roll_input > 0.0:
             reward = 1.0
         return reward
 
+    def get_rewards(self, game_state):
+        roll_inputs = game_state.inputs[:, 3]
+        rolling = (
+            (game_state.car_positions[:, 2] > self.height_threshold)
+            & (game_state.features.distance_to_ball < self.distance_threshold)
+            & (roll_inputs > 0.0)
+        )
+        return rolling.astype(np.float64)
+
 class HoldInputReward:
     def __init__(self, weights):
         self.weights = weights
@@ -339,10 +463,21 @@ class HoldInputReward:
 
         return reward
 
-
-
-
-
-
-
-
+    def get_rewards(self, game_state):
+        players = game_state.players
+        steer, throttle, pitch, roll = game_state.inputs[:, :4].T
+        jump, boost, handbrake, use_item = game_state.inputs[:, 4:].T != 0
+
+        reward = np.zeros(len(players))
+        for values, positive, negative in (
+            (steer, 'positive_steer', 'negative_steer'),
+            (throttle, 'positive_throttle', 'negative_throttle'),
+            (pitch, 'positive_pitch', 'negative_pitch'),
+            (roll, 'positive_roll', 'negative_roll'),
+        ):
+            reward += np.where(values > 0, self.weights[positive], np.where(values < 0, self.weights[negative], 0.0))
+        reward += jump * self.weights['jump']
+        reward += boost * self.weights['boost']
+        reward += handbrake * self.weights['handbrake']
+        reward += use_item * self.weights['use_item']
+        return reward